@@ -0,0 +1,164 @@
+# audio_io.py
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def is_network_path(filepath):
+    path = os.path.abspath(filepath)
+    return path.startswith("\\\\") or path.startswith("//")
+
+
+def is_directly_readable(filepath):
+    try:
+        with open(filepath, "rb") as f:
+            f.read(1)
+        return True
+    except OSError:
+        return False
+
+
+def extract_audio(filepath, target_path):
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+        "-i", filepath, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), target_path,
+    ]
+    subprocess.run(cmd, check=True, capture_output=True)
+
+
+@contextmanager
+def prepared_input(filepath, copy_mode="auto"):
+    """Yield a path Whisper can decode from.
+
+    By default the original file is decoded in place. Only network paths,
+    unreadable/locked files or ``copy_mode="always"`` get a local copy, which
+    holds just the 16 kHz mono audio track and is removed on exit.
+    """
+    needs_copy = copy_mode == "always" or (
+        copy_mode == "auto" and (is_network_path(filepath) or not is_directly_readable(filepath))
+    )
+    if not needs_copy:
+        yield filepath
+        return
+
+    temp_dir = tempfile.mkdtemp(prefix="transcriber_")
+    try:
+        base = os.path.splitext(os.path.basename(filepath))[0]
+        local_path = os.path.join(temp_dir, f"{base}.wav")
+        try:
+            extract_audio(filepath, local_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logging.warning("Audio extraction failed for %s (%s), copying file instead", filepath, e)
+            local_path = os.path.join(temp_dir, os.path.basename(filepath))
+            shutil.copy(filepath, local_path)
+        logging.info("Using local copy %s for %s", local_path, filepath)
+        yield local_path
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def probe_duration(filepath):
+    try:
+        import ffmpeg
+        return float(ffmpeg.probe(filepath)["format"]["duration"])
+    except Exception:
+        return 0.0
+
+
+def load_audio(filepath):
+    chunks = [samples for _, samples in stream_audio(filepath, overlap_seconds=0.0)]
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+
+class AudioStream:
+    """16 kHz mono audio read sequentially from a stream of s16le PCM bytes.
+
+    ``read`` returns the next samples from ``offset_seconds`` on without
+    consuming them; ``advance`` consumes them. Only audio that has been read
+    but not consumed is buffered, so a caller can look at a window, keep part
+    of it and read it again together with the following audio.
+    """
+
+    def __init__(self, source, start_seconds=0.0):
+        self.source = source
+        self._start = int(start_seconds * SAMPLE_RATE)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._eof = False
+
+    @property
+    def offset_seconds(self):
+        return self._start / SAMPLE_RATE
+
+    def read(self, seconds):
+        """Return ``(samples, is_last)``: up to ``seconds`` of audio and whether it reaches the end."""
+        size = int(seconds * SAMPLE_RATE)
+        if len(self._buffer) < size and not self._eof:
+            needed = (size - len(self._buffer)) * 2
+            raw = self.source.read(needed)
+            samples = np.frombuffer(raw[: len(raw) // 2 * 2], np.int16).astype(np.float32) / 32768.0
+            self._buffer = np.concatenate([self._buffer, samples])
+            self._eof = len(raw) < needed
+        return self._buffer[:size], self._eof and len(self._buffer) <= size
+
+    @property
+    def buffered(self):
+        """Number of samples read but not consumed yet."""
+        return len(self._buffer)
+
+    def advance(self, seconds):
+        count = min(max(int(round(seconds * SAMPLE_RATE)), 0), len(self._buffer))
+        self._buffer = self._buffer[count:]
+        self._start += count
+
+
+@contextmanager
+def open_audio_stream(filepath, start_seconds=0.0):
+    """Decode ``filepath`` through ffmpeg from ``start_seconds`` on and yield an ``AudioStream``."""
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-ss", str(start_seconds), "-i", filepath, "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE), "-",
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        yield AudioStream(process.stdout, start_seconds)
+        process.stdout.close()
+        if process.wait() != 0:
+            error = process.stderr.read().decode(errors="replace").strip()
+            raise RuntimeError(f"Failed to decode audio: {error}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def stream_audio(filepath, window_seconds=30.0, overlap_seconds=2.0, start_seconds=0.0):
+    """Decode ``filepath`` through ffmpeg in bounded windows.
+
+    Yields ``(offset_seconds, samples)`` pairs where ``samples`` is a float32
+    array of at most ``window_seconds`` of 16 kHz mono audio. Consecutive
+    windows share ``overlap_seconds`` of audio. Decoding begins at
+    ``start_seconds``; offsets are relative to the start of the file.
+    """
+    if not 0 <= int(overlap_seconds * SAMPLE_RATE) < int(window_seconds * SAMPLE_RATE):
+        raise ValueError("overlap_seconds must be smaller than window_seconds")
+
+    with open_audio_stream(filepath, start_seconds) as audio:
+        carried = 0
+        while True:
+            offset = audio.offset_seconds
+            samples, is_last = audio.read(window_seconds)
+            # A window holding only the previous overlap adds nothing
+            if len(samples) > carried:
+                yield offset, samples
+            if is_last or len(samples) <= carried:
+                break
+            audio.advance(len(samples) / SAMPLE_RATE - overlap_seconds)
+            carried = audio.buffered
@@ -0,0 +1,125 @@
+# backends.py
+import logging
+
+# Every backend loads a model object whose ``transcribe(audio, language=...,
+# initial_prompt=...)`` returns openai-whisper's {"text", "segments"} shape.
+DEFAULT_BACKEND = "whisper"
+
+
+def load_openai_whisper(model_name, device, dtype):
+    import whisper
+
+    model = whisper.load_model(model_name, device=device)
+    if dtype == "float16":
+        model = model.half()
+    return model
+
+
+def load_quantized_whisper(model_name, device, dtype):
+    """openai-whisper with its Linear layers dynamically quantized to int8 (CPU only).
+
+    The float32 model is loaded first and quantized in place, so it must
+    still fit into memory while loading; only the resident model is smaller.
+    """
+    import torch
+    import whisper
+
+    model = whisper.load_model(model_name, device="cpu")
+    # whisper's Linear subclass only adds a dtype cast for fp16; quantize_dynamic
+    # recognises plain nn.Linear modules
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    # In place: the default deep-copies the float32 model first
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class FasterWhisperModel:
+    """Adapter giving a faster-whisper (CTranslate2) model the openai-whisper interface."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, language=None, initial_prompt=None, checkpoint=None, **kwargs):
+        # Greedy decoding, like openai-whisper's default
+        kwargs.setdefault("beam_size", 1)
+        segments, _ = self.model.transcribe(audio, language=language, initial_prompt=initial_prompt, **kwargs)
+        results = []
+        # Segments are decoded lazily, one at a time
+        for segment in segments:
+            if checkpoint is not None:
+                checkpoint()
+            result = {
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            # Only filled in with word_timestamps=True
+            if segment.words:
+                result["words"] = [
+                    {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                    for word in segment.words
+                ]
+            results.append(result)
+        return {"text": "".join(segment["text"] for segment in results), "segments": results}
+
+    def detect_language(self, audio):
+        """Return ``(language, probability)``; faster-whisper detects it before decoding starts."""
+        _, info = self.model.transcribe(audio, beam_size=1)
+        return info.language, info.language_probability
+
+
+def load_faster_whisper(model_name, device, dtype):
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as e:
+        raise ImportError("The faster-whisper backend needs the faster-whisper package") from e
+    logging.info("Loading faster-whisper model %s with compute type %s", model_name, dtype)
+    return FasterWhisperModel(WhisperModel(model_name, device=device, compute_type=dtype))
+
+
+def transcribe_with_checkpoints(model, audio, checkpoint=None, **options):
+    """Run ``model.transcribe``, calling ``checkpoint`` while it decodes.
+
+    A blocking ``checkpoint`` pauses the transcription and a raising one
+    aborts it, so a job can be paused or cancelled in the middle of a file.
+    openai-whisper models call it before every decoder step (from a forward
+    pre-hook, so the model must not be shared between threads), faster-whisper
+    before every segment.
+    """
+    if checkpoint is None:
+        return model.transcribe(audio, **options)
+    if isinstance(model, FasterWhisperModel):
+        return model.transcribe(audio, checkpoint=checkpoint, **options)
+    decoder = getattr(model, "decoder", None)
+    if decoder is None:
+        return model.transcribe(audio, **options)
+    handle = decoder.register_forward_pre_hook(lambda module, args: checkpoint())
+    try:
+        return model.transcribe(audio, **options)
+    finally:
+        handle.remove()
+
+
+# name -> loader, default dtype and the devices it can run on
+# "concurrent": whether several threads may transcribe with one loaded model.
+# openai-whisper keeps its decoder kv-cache on the shared module, so it may not.
+BACKENDS = {
+    "whisper": {"load": load_openai_whisper, "dtype": "float32", "devices": ("cpu", "cuda"), "concurrent": False},
+    "whisper-int8": {"load": load_quantized_whisper, "dtype": "int8", "devices": ("cpu",), "concurrent": False},
+    "faster-whisper": {"load": load_faster_whisper, "dtype": "int8", "devices": ("cpu", "cuda"), "concurrent": True},
+}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name or DEFAULT_BACKEND]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r}; choose one of {', '.join(BACKENDS)}") from None
+
+
+def load_model(model_name, device, dtype, backend=DEFAULT_BACKEND):
+    return get_backend(backend)["load"](model_name, device, dtype)
@@ -0,0 +1,306 @@
+# batch_cli.py
+import argparse
+import glob
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from clip_batching import DEFAULT_BATCH_SIZE, MAX_CLIP_SECONDS, plan_batches
+from generate_srt import DEFAULT_MAX_CUE_SECONDS, DEFAULT_MAX_LINE_CHARS, DEFAULT_MAX_LINES, DEFAULT_MIN_CUE_SECONDS
+from job_manifest import DEFAULT_MAX_ATTEMPTS, JobManifest
+from scheduler import InsufficientMemory, plan_resources
+
+MANIFEST_NAME = ".transcription_jobs.sqlite"
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".mp4", ".mov", ".ogg")
+
+
+def expand_inputs(inputs):
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, filenames in os.walk(item):
+                for name in sorted(filenames):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        files.append(os.path.join(dirpath, name))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            files.extend(
+                path for path in sorted(glob.glob(item, recursive=True))
+                if os.path.isfile(path) and path.lower().endswith(AUDIO_EXTENSIONS)
+            )
+    seen = set()
+    unique = []
+    for path in files:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def expected_outputs(filepath, output_dir, generate_srt_file, generate_vtt_file=False, generate_json_file=False):
+    base = os.path.splitext(os.path.basename(filepath))[0]
+    outputs = [os.path.join(output_dir, f"{base}.txt")]
+    for ext, enabled in (("srt", generate_srt_file), ("vtt", generate_vtt_file), ("json", generate_json_file)):
+        if enabled:
+            outputs.append(os.path.join(output_dir, f"{base}.{ext}"))
+    return outputs
+
+
+def _init_worker(threads):
+    # CTranslate2 (faster-whisper backend) takes its thread count from here
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def _transcribe_one(filepath, output_dir, options, use_cache=True, events_path=None):
+    from audio_io import prepared_input, probe_duration
+    from instrumentation import JsonlEventLog
+    from result_cache import default_result_cache
+    from transcriber import transcribe_audio_file
+
+    start = time.perf_counter()
+    summary = {}
+    event_log = JsonlEventLog(events_path) if events_path else None
+    try:
+        with prepared_input(filepath) as local_path:
+            cache = default_result_cache() if use_cache else None
+            summary = transcribe_audio_file(local_path, output_dir, cache=cache, on_event=event_log, **options)
+        error = None
+    except Exception as e:
+        logging.error("Error processing %s: %s", filepath, str(e))
+        error = str(e)
+    finally:
+        if event_log:
+            event_log.close()
+    wall = time.perf_counter() - start
+    return filepath, probe_duration(filepath), wall, error, summary
+
+
+def _transcribe_group(filepaths, output_dir, options, use_cache=True, events_path=None):
+    """Transcribe one group from ``plan_batches``; returns a ``_transcribe_one`` result per file."""
+    if len(filepaths) == 1:
+        return [_transcribe_one(filepaths[0], output_dir, options, use_cache, events_path)]
+
+    from contextlib import ExitStack
+    from audio_io import prepared_input, probe_duration
+    from clip_batching import transcribe_clip_batch
+    from instrumentation import JsonlEventLog
+    from result_cache import default_result_cache
+
+    # Streaming and resuming only apply to long recordings
+    clip_options = {name: value for name, value in options.items() if name not in ("streaming", "resume")}
+    start = time.perf_counter()
+    event_log = JsonlEventLog(events_path) if events_path else None
+    try:
+        with ExitStack() as stack:
+            local_paths = [stack.enter_context(prepared_input(f)) for f in filepaths]
+            cache = default_result_cache() if use_cache else None
+            outcomes = transcribe_clip_batch(local_paths, output_dir, cache=cache, on_event=event_log, **clip_options)
+    except Exception as e:
+        logging.error("Batch of %d clips failed (%s), transcribing them one by one", len(filepaths), e)
+        return [_transcribe_one(f, output_dir, options, use_cache, events_path) for f in filepaths]
+    finally:
+        if event_log:
+            event_log.close()
+    wall = (time.perf_counter() - start) / len(filepaths)
+    return [
+        (filepath, probe_duration(filepath), wall, str(error) if error else None, summary or {})
+        for filepath, (_, summary, error) in zip(filepaths, outcomes)
+    ]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Transcribe audio files without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="Audio files, directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", required=True, help="Directory for the transcripts")
+    parser.add_argument("-m", "--model", default="tiny", help="Whisper model name (default: tiny)")
+    parser.add_argument("-l", "--language", default="de",
+                        help="Language code, or auto to detect it per file from the first 30s (default: de)")
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                        help="Inference engine: whisper (PyTorch), whisper-int8 (dynamically quantized, CPU) "
+                             "or faster-whisper (CTranslate2 int8) (default: whisper)")
+    parser.add_argument("--punctuate", action="store_true", help="Convert spoken punctuation commands")
+    parser.add_argument("--srt", action="store_true", help="Also write an SRT file")
+    parser.add_argument("--vtt", action="store_true", help="Also write a WebVTT file")
+    parser.add_argument("--json", action="store_true", help="Also write the segments (and word timings) as JSON")
+    parser.add_argument("--word-timestamps", action="store_true",
+                        help="Align every word so subtitle cues are cut at word boundaries (slower)")
+    parser.add_argument("--max-line-chars", type=int, default=DEFAULT_MAX_LINE_CHARS,
+                        help=f"Subtitle characters per line (default: {DEFAULT_MAX_LINE_CHARS})")
+    parser.add_argument("--max-lines", type=int, default=DEFAULT_MAX_LINES,
+                        help=f"Subtitle lines per cue (default: {DEFAULT_MAX_LINES})")
+    parser.add_argument("--min-cue-seconds", type=float, default=DEFAULT_MIN_CUE_SECONDS,
+                        help=f"Shortest subtitle cue, where the next one leaves room (default: {DEFAULT_MIN_CUE_SECONDS})")
+    parser.add_argument("--max-cue-seconds", type=float, default=DEFAULT_MAX_CUE_SECONDS,
+                        help=f"Longest subtitle cue (default: {DEFAULT_MAX_CUE_SECONDS})")
+    parser.add_argument("--vad", action="store_true", help="Only transcribe detected speech regions")
+    parser.add_argument("--streaming", action="store_const", const=True,
+                        help="Always decode and transcribe in bounded windows (default: only long recordings)")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="Number of worker processes (default: as many as CPUs and free memory allow)")
+    parser.add_argument("-t", "--threads", type=int, help="Torch intra-op threads per worker")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                        help="Memory the workers may use together (default: free memory minus 1 GB)")
+    parser.add_argument("--no-downgrade", action="store_true",
+                        help="Fail instead of switching to a smaller model when the chosen one does not fit in memory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Re-transcribe files whose outputs exist or that the manifest lists as done")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue partial (.part) outputs after their last completed SRT cue "
+                             "(implies --streaming --srt)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Decode up to this many clips of at most {MAX_CLIP_SECONDS:.0f}s together "
+                             f"(default: {DEFAULT_BATCH_SIZE}, 1 disables batching)")
+    parser.add_argument("--events", metavar="FILE", help="Append per-stage timing and progress events to a JSONL file")
+    parser.add_argument("--manifest", metavar="FILE",
+                        help=f"SQLite job manifest for resuming interrupted runs (default: <output-dir>/{MANIFEST_NAME})")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Attempts per file before it is reported as failed (default: {DEFAULT_MAX_ATTEMPTS})")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.resume:
+        args.streaming = True
+        args.srt = True
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    files = expand_inputs(args.inputs)
+    # Outputs are only renamed into place once complete, so existing ones are finished
+    if not args.overwrite:
+        skipped = {
+            f for f in files
+            if all(os.path.exists(p) for p in expected_outputs(f, args.output_dir, args.srt, args.vtt, args.json))
+        }
+        files = [f for f in files if f not in skipped]
+        if skipped:
+            print(f"Skipping {len(skipped)} file(s) with existing outputs")
+    if not files:
+        print("Nothing to transcribe.")
+        return 0
+
+    try:
+        plan = plan_resources(args.model, args.backend, jobs=len(files), workers=args.workers, threads=args.threads,
+                              budget_mb=args.memory_budget, allow_downgrade=not args.no_downgrade)
+    except InsufficientMemory as e:
+        print(f"ERROR: {e}. Choose a smaller model or the faster-whisper backend.", file=sys.stderr)
+        return 2
+    for warning in plan.warnings:
+        print(f"WARNING: {warning}", file=sys.stderr)
+
+    options = {
+        "model_name": plan.model_name,
+        "language": args.language,
+        "apply_punctuation": args.punctuate,
+        "generate_srt_file": args.srt,
+        "streaming": args.streaming,
+        "vad": args.vad,
+        "backend": args.backend,
+        "generate_vtt_file": args.vtt,
+        "generate_json_file": args.json,
+        "word_timestamps": args.word_timestamps,
+        "cue_options": {
+            "max_line_chars": args.max_line_chars,
+            "max_lines": args.max_lines,
+            "min_duration": args.min_cue_seconds,
+            "max_duration": args.max_cue_seconds,
+        },
+    }
+    manifest = JobManifest(args.manifest or os.path.join(args.output_dir, MANIFEST_NAME), args.max_attempts)
+    batch = manifest.add_batch(files, args.output_dir, options, skip_done=not args.overwrite)
+    jobs = manifest.ready(batch)
+    if not jobs and manifest.next_retry_in(batch) is None:
+        print("Nothing to transcribe.")
+        return 0
+
+    groups = plan_batches([job.filepath for job in jobs], args.batch_size)
+    workers, threads = min(plan.workers, max(len(groups), 1)), plan.threads
+    batched = sum(len(group) for group in groups if len(group) > 1)
+    print(f"Transcribing {len(manifest.unfinished(batch))} file(s) with {workers} worker(s) x {threads} thread(s) "
+          f"using {plan.model_name} on the {args.backend} backend")
+    if batched:
+        print(f"{batched} short clip(s) are decoded in batches of up to {args.batch_size}")
+
+    run_options = dict(options, resume=args.resume)
+    total_audio = 0.0
+    uncertain = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        while True:
+            if not jobs:
+                delay = manifest.next_retry_in(batch)
+                if delay is None:
+                    break
+                print(f"Retrying failed file(s) in {delay:.0f}s")
+                time.sleep(delay)
+                jobs = manifest.ready(batch)
+                groups = plan_batches([job.filepath for job in jobs], args.batch_size)
+                continue
+            by_path = {job.filepath: job for job in jobs}
+            for job in jobs:
+                manifest.mark_running(job.id)
+            futures = [
+                pool.submit(_transcribe_group, group, args.output_dir, run_options, not args.no_cache, args.events)
+                for group in groups
+            ]
+            for future in as_completed(futures):
+                for filepath, audio_seconds, wall, error, summary in future.result():
+                    job = by_path[filepath]
+                    if error:
+                        delay = manifest.mark_failed(job.id, error)
+                        retry = f" (retrying in {delay:.0f}s)" if delay is not None else ""
+                        print(f"FAILED {filepath}: {error}{retry}")
+                        continue
+                    manifest.mark_done(job.id, summary)
+                    total_audio += audio_seconds
+                    speed = audio_seconds / wall if wall else 0.0
+                    line = f"{filepath}: {audio_seconds:.1f}s audio in {wall:.1f}s ({speed:.2f}x)"
+                    if summary.get("vad"):
+                        line += f", VAD skipped {summary['vad']['saved_fraction']:.0%}"
+                    detection = summary.get("language_detection")
+                    if detection:
+                        line += f", language {detection['language']} ({detection['probability']:.0%})"
+                        if detection["low_confidence"]:
+                            uncertain.append(filepath)
+                            line += " UNCERTAIN"
+                    print(line)
+            jobs = manifest.ready(batch)
+            groups = plan_batches([job.filepath for job in jobs], args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    counts = manifest.counts(batch)
+    failures = counts["failed"]
+    throughput = total_audio / elapsed if elapsed else 0.0
+    print(
+        f"Done: {counts['done']} ok, {failures} failed, "
+        f"{total_audio:.1f}s audio in {elapsed:.1f}s wall ({throughput:.2f} audio-s/wall-s)"
+    )
+    if uncertain:
+        print(f"Language detection was uncertain for {len(uncertain)} file(s), please check: " + ", ".join(uncertain))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+# benchmark.py
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE
+
+DEFAULT_LENGTHS = [10, 60, 300]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process over its whole lifetime; see ``run_isolated``."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_isolated(func, *args, **kwargs):
+    """Run ``func`` in a fresh process, so that ``peak_rss_mb`` there covers this call alone."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args, **kwargs).result()
+
+
+def timed(func, *args, repeat=1, **kwargs):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def synthetic_audio(seconds, seed=0):
+    """Speech-like test signal: voiced bursts of varying pitch separated by pauses."""
+    rng = np.random.default_rng(seed)
+    samples = rng.normal(0, 0.003, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    position = 0
+    while position < len(samples):
+        burst = int(rng.uniform(0.3, 2.5) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.1, 1.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, len(samples) - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 250)
+        envelope = np.sin(np.pi * t / max(t[-1], 1e-3)) if len(t) else t
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        samples[position:position + len(t)] += (0.2 * envelope * voiced).astype(np.float32)
+        position += burst + pause
+    return np.clip(samples, -1.0, 1.0)
+
+
+def write_wav(path, samples):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+
+def synthetic_dictation(n_words, seed=0):
+    rng = random.Random(seed)
+    words = ("das ist ein kurzer Test der Aufnahme mit vielen Wörtern und Sätzen über "
+             "Recht Gesetz Vertrag Mandant Gericht").split()
+    commands = ["Punkt", "Komma", "Absatz", "Doppelpunkt", "§ 5 Absatz 2", "nächste Ziffer."]
+    return " ".join(rng.choice(commands) if rng.random() < 0.08 else rng.choice(words) for _ in range(n_words))
+
+
+def synthetic_segments(n_segments, seed=0):
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    for i in range(n_segments):
+        duration = rng.uniform(1.0, 6.0)
+        segments.append({"id": i, "start": start, "end": start + duration, "text": " " + synthetic_dictation(12, i)})
+        start += duration + rng.uniform(0.0, 0.5)
+    return segments
+
+
+def run_micro_benchmarks(repeat=3):
+    from generate_srt import build_cues, generate_srt
+    from output_writers import SrtWriter, TxtWriter
+    from punctuation_replacer import transform_text_content, transform_text_stream
+    from vad import detect_speech
+
+    results = []
+
+    def record(name, size, seconds, unit):
+        results.append({
+            "name": name,
+            "size": size,
+            "unit": unit,
+            "seconds": round(seconds, 6),
+            "per_second": round(size / seconds, 1) if seconds else None,
+        })
+
+    for n_words in (10_000, 100_000):
+        text = synthetic_dictation(n_words)
+        seconds, _ = timed(transform_text_content, text, repeat=repeat)
+        record("transform_text_content", n_words, seconds, "words")
+
+        pieces = [" " + " ".join(chunk) for chunk in _chunks(text.split(), 12)]
+        seconds, _ = timed(lambda: "".join(transform_text_stream(pieces)), repeat=repeat)
+        record("transform_text_stream", n_words, seconds, "words")
+
+    for n_segments in (1_000, 20_000):
+        segments = synthetic_segments(n_segments)
+        seconds, _ = timed(generate_srt, segments, repeat=repeat)
+        record("generate_srt", n_segments, seconds, "segments")
+
+        # About 12 words per segment, 240k words for the larger run
+        seconds, _ = timed(lambda: sum(1 for _ in build_cues(segments)), repeat=repeat)
+        record("build_cues", n_segments * 12, seconds, "words")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            def write_outputs():
+                with TxtWriter(os.path.join(temp_dir, "out.txt")) as txt, \
+                        SrtWriter(os.path.join(temp_dir, "out.srt")) as srt:
+                    for segment in segments:
+                        txt.write_segment(segment)
+                        srt.write_segment(segment)
+            seconds, _ = timed(write_outputs, repeat=repeat)
+        record("txt_srt_writers", n_segments, seconds, "segments")
+
+    for length in (60, 600):
+        samples = synthetic_audio(length)
+        seconds, _ = timed(detect_speech, samples, repeat=repeat)
+        record("vad_detect_speech", length, seconds, "audio_seconds")
+
+    return results
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _pipeline_case(model_name, path, language, output_dir):
+    from audio_io import load_audio, probe_duration
+    from generate_srt import generate_srt
+    from model_cache import default_cache
+    from punctuation_replacer import transform_text_content
+    from transcriber import transcribe_audio_file
+
+    # transcribe_audio_file reuses the model loaded here
+    load_seconds, model = timed(default_cache().get, model_name)
+    duration = probe_duration(path)
+    decode_seconds, samples = timed(load_audio, path)
+    duration = duration or len(samples) / SAMPLE_RATE
+
+    inference_seconds, result = timed(model.transcribe, samples, language=language)
+    post_seconds, _ = timed(
+        lambda: (transform_text_content(result["text"], language), generate_srt(result["segments"]))
+    )
+    end_to_end_seconds, _ = timed(
+        transcribe_audio_file, path, output_dir, model_name=model_name,
+        language=language, apply_punctuation=True, generate_srt_file=True,
+    )
+    return {
+        "model": model_name,
+        "input": os.path.basename(path),
+        "audio_seconds": round(duration, 2),
+        "model_load_seconds": round(load_seconds, 3),
+        "decode_seconds": round(decode_seconds, 3),
+        "inference_seconds": round(inference_seconds, 3),
+        "postprocess_seconds": round(post_seconds, 4),
+        "end_to_end_seconds": round(end_to_end_seconds, 3),
+        "real_time_factor": round(inference_seconds / duration, 4) if duration else None,
+        "segments": len(result["segments"]),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_pipeline_benchmarks(models, lengths, language="de", audio_files=()):
+    """Benchmark every model on every input, each case in its own process.
+
+    A fresh process measures the first load of the model and gives each
+    case its own peak memory figure.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        inputs = list(audio_files)
+        for length in lengths:
+            path = os.path.join(temp_dir, f"synthetic_{length}s.wav")
+            write_wav(path, synthetic_audio(length, seed=length))
+            inputs.append(path)
+        output_dir = os.path.join(temp_dir, "out")
+        os.makedirs(output_dir, exist_ok=True)
+
+        for model_name in models:
+            for path in inputs:
+                results.append(run_isolated(_pipeline_case, model_name, path, language, output_dir))
+                print(json.dumps(results[-1]))
+    return results
+
+
+def run_batching_benchmarks(models, n_clips=16, clip_seconds=10, batch_size=8, language="de"):
+    """Compare one-file-at-a-time transcription of short clips with batched decoding."""
+    from clip_batching import transcribe_clip_batch
+    from model_cache import default_cache
+    from transcriber import transcribe_audio_file
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        clips = []
+        for i in range(n_clips):
+            path = os.path.join(temp_dir, f"clip_{i}.wav")
+            write_wav(path, synthetic_audio(clip_seconds, seed=i))
+            clips.append(path)
+        output_dir = os.path.join(temp_dir, "out")
+        os.makedirs(output_dir, exist_ok=True)
+
+        for model_name in models:
+            cache = default_cache()
+            cache.clear()
+            cache.get(model_name)
+            sequential_seconds, _ = timed(
+                lambda: [transcribe_audio_file(path, output_dir, model_name=model_name, language=language,
+                                               streaming=False) for path in clips]
+            )
+            batched_seconds, _ = timed(
+                lambda: [transcribe_clip_batch(clips[i:i + batch_size], output_dir, model_name=model_name,
+                                               language=language) for i in range(0, n_clips, batch_size)]
+            )
+            results.append({
+                "model": model_name,
+                "clips": n_clips,
+                "clip_seconds": clip_seconds,
+                "batch_size": batch_size,
+                "sequential_seconds": round(sequential_seconds, 3),
+                "batched_seconds": round(batched_seconds, 3),
+                "speedup": round(sequential_seconds / batched_seconds, 2) if batched_seconds else None,
+            })
+            print(json.dumps(results[-1]))
+            cache.clear()
+    return results
+
+
+def host_info():
+    info = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+        info["cuda"] = torch.cuda.is_available()
+    except ImportError:
+        pass
+    return info
+
+
+def default_models():
+    from model_cache import MODEL_MAPPING
+    return list(dict.fromkeys(MODEL_MAPPING.values()))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the transcription pipeline.")
+    parser.add_argument("-o", "--output", help="JSON file for the results (default: benchmark_<timestamp>.json)")
+    parser.add_argument("--micro-only", action="store_true", help="Only run the CPU text/audio micro-benchmarks")
+    parser.add_argument("--models", nargs="+", help="Whisper models to benchmark (default: all GUI models)")
+    parser.add_argument("--lengths", nargs="+", type=int, default=DEFAULT_LENGTHS,
+                        help="Lengths in seconds of the synthetic test recordings")
+    parser.add_argument("--audio", nargs="+", default=[], help="Additional real recordings to include")
+    parser.add_argument("-l", "--language", default="de", help="Language code (default: de)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per micro-benchmark (best is kept)")
+    parser.add_argument("--clips", type=int, default=16,
+                        help="Number of short clips for the batched vs. one-by-one comparison (0 skips it)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    started = datetime.now(timezone.utc)
+    report = {"started": started.isoformat(), "host": host_info()}
+
+    report["micro"] = run_micro_benchmarks(args.repeat)
+    for entry in report["micro"]:
+        print(f"{entry['name']:<24} {entry['size']:>8} {entry['unit']:<14} {entry['seconds']:.4f}s")
+
+    if not args.micro_only:
+        models = args.models or default_models()
+        report["pipeline"] = run_pipeline_benchmarks(models, args.lengths, args.language, args.audio)
+        if args.clips:
+            report["batching"] = run_batching_benchmarks(models, args.clips, language=args.language)
+
+    output = args.output or f"benchmark_{started.strftime('%Y%m%dT%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
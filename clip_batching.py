@@ -0,0 +1,242 @@
+# clip_batching.py
+import logging
+import os
+import time
+
+from audio_io import SAMPLE_RATE, load_audio, probe_duration
+from backends import DEFAULT_BACKEND, FasterWhisperModel
+from instrumentation import FileProgress
+from language_id import AUTO, detect_languages, language_info, log_detection
+from model_cache import default_cache, get_model
+from output_writers import write_transcript
+from punctuation_replacer import punctuation_stream
+from vad import SpeechTimeline, detect_speech
+
+# Recordings up to one Whisper window long can share a decoder batch
+MAX_CLIP_SECONDS = 30.0
+DEFAULT_BATCH_SIZE = 8
+# Seconds per Whisper timestamp token
+TIME_PRECISION = 0.02
+# openai-whisper's thresholds for a failed or silent window
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def plan_batches(filepaths, batch_size=DEFAULT_BATCH_SIZE):
+    """Group ``filepaths`` for transcription.
+
+    Short clips are packed into groups of up to ``batch_size`` in the order
+    they appear; every longer (or unreadable) file forms a group of its own.
+    """
+    groups = []
+    pending = []
+    for path in filepaths:
+        duration = probe_duration(path) if batch_size > 1 else 0.0
+        if 0 < duration <= MAX_CLIP_SECONDS:
+            pending.append(path)
+            if len(pending) == batch_size:
+                groups.append(pending)
+                pending = []
+        else:
+            groups.append([path])
+    if pending:
+        groups.append(pending)
+    return groups
+
+
+def split_timestamped_tokens(tokens, tokenizer, duration):
+    """Turn a decoded token sequence with timestamp tokens into segments."""
+    segments = []
+    start = None
+    text_tokens = []
+    for token in list(tokens) + [None]:
+        if token is not None and token < tokenizer.timestamp_begin:
+            text_tokens.append(token)
+            continue
+        timestamp = (token - tokenizer.timestamp_begin) * TIME_PRECISION if token is not None else duration
+        if text_tokens:
+            text = tokenizer.decode(text_tokens)
+            if text.strip():
+                begin = min(start or 0.0, duration)
+                segments.append({"id": len(segments), "start": begin, "end": max(min(timestamp, duration), begin),
+                                 "text": text})
+            text_tokens = []
+            start = None
+        else:
+            start = timestamp
+    return segments
+
+
+def decode_clip_batch(model, clips, language="de"):
+    """Transcribe up to 30 s long sample arrays with one batched encoder and decoder pass.
+
+    Returns one segment list per clip. Clips whose result fails openai-whisper's
+    quality checks are transcribed again on their own, with its temperature
+    fallback.
+    """
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), n_mels=model.dims.n_mels) for clip in clips
+    ]).to(model.device)
+    fp16 = next(model.parameters()).dtype == torch.float16
+    results = whisper.decode(model, mels, whisper.DecodingOptions(language=language, fp16=fp16))
+    tokenizer = get_tokenizer(
+        model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe"
+    )
+
+    batch = []
+    for clip, result in zip(clips, results):
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+            segments = []
+        elif result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD:
+            segments = model.transcribe(clip, language=language)["segments"]
+        else:
+            segments = split_timestamped_tokens(result.tokens, tokenizer, len(clip) / SAMPLE_RATE)
+        batch.append(segments)
+    return batch
+
+
+def transcribe_clip_batch(filepaths, output_dir, model_name="base", language="de", apply_punctuation=False,
+                          generate_srt_file=False, vad=False, cache=None, backend=None, on_event=None,
+                          control=None, generate_vtt_file=False, generate_json_file=False, word_timestamps=False,
+                          cue_options=None):
+    """Transcribe several short recordings together and write each one's TXT/SRT files.
+
+    Takes the same options as ``transcribe_audio_file``. Returns
+    ``(filepath, summary, error)`` for every file, in order; a file that
+    cannot be read fails on its own without affecting the rest of the batch.
+    With ``language="auto"`` the languages of all clips are detected in one
+    pass and every language is decoded as a batch of its own.
+    """
+    backend = backend or DEFAULT_BACKEND
+    jobs = []
+    for filepath in filepaths:
+        progress = FileProgress(filepath, on_event, probe_duration(filepath))
+        progress.emit("start", audio_seconds=round(progress.audio_seconds, 2), model=model_name,
+                      language=language, backend=backend, batch_size=len(filepaths))
+        jobs.append({"path": filepath, "progress": progress, "error": None, "segments": None,
+                     "vad": {"audio_seconds": 0.0, "speech_seconds": 0.0} if vad else None,
+                     "detection": None})
+
+    for job in jobs:
+        if cache is not None:
+            job["key"] = cache.key(job["path"], model=model_name, language=language, vad=vad, streaming=False,
+                                   backend=backend, word_timestamps=word_timestamps)
+            cached = cache.get(job["key"])
+            if language == AUTO and cached is not None and "language" not in cached:
+                cached = None
+            if cached is not None:
+                job["progress"].emit("cache_hit")
+                job["segments"] = cached["segments"]
+                job["detection"] = cached.get("language")
+                continue
+        try:
+            with job["progress"].stage("decode"):
+                samples = load_audio(job["path"])
+        except Exception as e:
+            job["error"] = e
+            continue
+        job["timeline"] = None
+        if vad:
+            timeline = job["timeline"] = SpeechTimeline(samples, detect_speech(samples))
+            job["vad"]["audio_seconds"] = timeline.total_seconds
+            job["vad"]["speech_seconds"] = timeline.speech_seconds
+            samples = timeline.audio
+        job["samples"] = samples
+
+    pending = [job for job in jobs if job["error"] is None and job["segments"] is None]
+    if pending:
+        if control is not None:
+            control.checkpoint()
+        is_loaded = default_cache().contains(model_name, backend=backend)
+        start = time.perf_counter()
+        model = get_model(model_name, backend=backend)
+        _emit_shared(pending, "model_load", time.perf_counter() - start, model=model_name, cached=is_loaded)
+
+        clips = [job for job in pending if len(job["samples"])]
+        groups = {language: clips}
+        if language == AUTO and clips:
+            start = time.perf_counter()
+            detected = detect_languages(model, [job["samples"] for job in clips])
+            _emit_shared(clips, "language_detection", time.perf_counter() - start, batch_size=len(clips))
+            groups = {}
+            for job, result in zip(clips, detected):
+                job["detection"] = language_info(*result)
+                groups.setdefault(job["detection"]["language"], []).append(job)
+
+        start = time.perf_counter()
+        for group_language, group in groups.items():
+            if isinstance(model, FasterWhisperModel) or word_timestamps:
+                # CTranslate2 models, and word timings (which need Whisper's
+                # per-file alignment pass), are transcribed one by one
+                options = {"word_timestamps": True} if word_timestamps else {}
+                decoded = [
+                    model.transcribe(job["samples"], language=group_language, **options)["segments"]
+                    for job in group
+                ]
+            else:
+                decoded = decode_clip_batch(model, [job["samples"] for job in group], group_language) if group else []
+            for job, segments in zip(group, decoded):
+                timeline = job["timeline"]
+                job["segments"] = [timeline.map_segment(s) for s in segments] if timeline else segments
+        _emit_shared(pending, "inference", time.perf_counter() - start, batch_size=len(clips),
+                     languages=len(groups))
+        for job in pending:
+            if job["segments"] is None:
+                job["segments"] = []
+
+    outcomes = []
+    for job in jobs:
+        progress = job["progress"]
+        if job["error"] is not None:
+            logging.error("Error processing %s: %s", job["path"], job["error"])
+            progress.emit("failed", error=str(job["error"]))
+            outcomes.append((job["path"], None, job["error"]))
+            continue
+
+        base = os.path.splitext(os.path.basename(job["path"]))[0]
+        paths = {ext: os.path.join(output_dir, f"{base}.{ext}") for ext in ("txt", "srt", "vtt", "json")}
+        enabled = {"txt": True, "srt": generate_srt_file, "vtt": generate_vtt_file, "json": generate_json_file}
+        outputs = [paths[ext] for ext in paths if enabled[ext]]
+        detection = job["detection"]
+        job_language = detection["language"] if detection else language
+        if detection:
+            log_detection(job["path"], detection)
+            progress.emit("language", **detection)
+        punctuation = punctuation_stream(job_language) if apply_punctuation else None
+        with progress.stage("write"):
+            write_transcript(
+                paths["txt"],
+                job["segments"],
+                srt_path=paths["srt"] if generate_srt_file else None,
+                punctuation=punctuation,
+                vtt_path=paths["vtt"] if generate_vtt_file else None,
+                json_path=paths["json"] if generate_json_file else None,
+                cue_options=cue_options,
+                metadata={"language": job_language, "language_detection": detection},
+            )
+        if cache is not None and "samples" in job:
+            cache.put(job["key"], "".join(segment["text"] for segment in job["segments"]), job["segments"],
+                      language=detection)
+        for segment in job["segments"]:
+            progress.segment(segment["end"], incremental=False)
+        vad_stats = job["vad"]
+        if vad_stats:
+            total = vad_stats["audio_seconds"]
+            vad_stats["saved_fraction"] = 1 - vad_stats["speech_seconds"] / total if total else 0.0
+        summary = {"vad": vad_stats, "outputs": outputs, "language": job_language, "language_detection": detection}
+        summary.update(progress.summary())
+        progress.emit("done", **progress.summary())
+        outcomes.append((job["path"], summary, None))
+    return outcomes
+
+
+def _emit_shared(jobs, stage, seconds, **fields):
+    """Report a stage that ran once for the whole batch to every file in it."""
+    for job in jobs:
+        job["progress"].add_time(stage, seconds)
+        job["progress"].emit(stage, phase="end", seconds=round(seconds, 4), **fields)
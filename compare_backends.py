@@ -0,0 +1,129 @@
+# compare_backends.py
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+from backends import BACKENDS, DEFAULT_BACKEND
+from benchmark import host_info, peak_rss_mb, run_isolated, timed
+
+
+def normalize_words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance between two texts, relative to the reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def find_reference(audio_path, reference_dir):
+    """Return the reference transcript ``<name>.txt`` for ``audio_path`` from ``reference_dir``, if any."""
+    base = os.path.splitext(os.path.basename(audio_path))[0]
+    path = os.path.join(reference_dir, f"{base}.txt")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _backend_case(model_name, backend, path, language):
+    from audio_io import SAMPLE_RATE, load_audio, probe_duration
+    from model_cache import default_cache
+
+    samples = load_audio(path)
+    duration = probe_duration(path) or len(samples) / SAMPLE_RATE
+    load_seconds, model = timed(default_cache().get, model_name, backend=backend)
+    seconds, result = timed(model.transcribe, samples, language=language)
+    return {"duration": duration, "load_seconds": load_seconds, "seconds": seconds, "text": result["text"],
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def compare_backends(backends, models, audio_files, language="de", reference_dir=None):
+    """Transcribe the same inputs with every backend and model.
+
+    Accuracy is the word error rate against a reference transcript where one
+    exists, otherwise against the first backend's output for the same model.
+    Every case runs in its own process, so its peak memory is its own.
+    """
+    references = {path: find_reference(path, reference_dir) if reference_dir else None for path in audio_files}
+
+    results = []
+    for model_name in models:
+        baseline = {}
+        baseline_seconds = {}
+        for backend in backends:
+            for path in audio_files:
+                case = run_isolated(_backend_case, model_name, backend, path, language)
+                seconds, text, duration = case["seconds"], case["text"], case["duration"]
+                if references[path] is not None:
+                    reference, reference_name = references[path], "transcript"
+                else:
+                    reference, reference_name = baseline.get(path), f"{backends[0]} output"
+                baseline.setdefault(path, text)
+                base_seconds = baseline_seconds.setdefault(path, seconds)
+                results.append({
+                    "backend": backend,
+                    "model": model_name,
+                    "input": os.path.basename(path),
+                    "audio_seconds": round(duration, 2),
+                    "model_load_seconds": round(case["load_seconds"], 3),
+                    "inference_seconds": round(seconds, 3),
+                    "real_time_factor": round(seconds / duration, 4) if duration else None,
+                    "speedup": round(base_seconds / seconds, 2) if seconds else None,
+                    "wer": round(word_error_rate(reference, text), 4) if reference is not None else None,
+                    "reference": reference_name if reference is not None else None,
+                    "peak_rss_mb": case["peak_rss_mb"],
+                    "text": text,
+                })
+                print(json.dumps({k: v for k, v in results[-1].items() if k != "text"}))
+    return results
+
+
+def print_table(results):
+    print(f"{'backend':<16} {'model':<10} {'input':<24} {'RTF':>8} {'speedup':>8} {'WER':>7}")
+    for r in results:
+        wer = f"{r['wer']:.1%}" if r["wer"] is not None else "-"
+        print(f"{r['backend']:<16} {r['model']:<10} {r['input'][:24]:<24} "
+              f"{r['real_time_factor']:>8.3f} {r['speedup']:>7.2f}x {wer:>7}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Compare speed and accuracy of the inference backends.")
+    parser.add_argument("audio", nargs="+", help="Recordings to transcribe with every backend")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS),
+                        default=[DEFAULT_BACKEND] + [b for b in BACKENDS if b != DEFAULT_BACKEND],
+                        help="Backends to compare; the first is the speed and (without references) accuracy baseline")
+    parser.add_argument("--models", nargs="+", default=["tiny"], help="Whisper models (default: tiny)")
+    parser.add_argument("--references", help="Directory with reference transcripts named <recording>.txt")
+    parser.add_argument("-l", "--language", default="de", help="Language code (default: de)")
+    parser.add_argument("-o", "--output", help="JSON file for the results (default: backends_<timestamp>.json)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    started = datetime.now(timezone.utc)
+    report = {"started": started.isoformat(), "host": host_info()}
+    report["results"] = compare_backends(args.backends, args.models, args.audio, args.language, args.references)
+    print_table(report["results"])
+
+    output = args.output or f"backends_{started.strftime('%Y%m%dT%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,128 @@
-def format_timestamp(seconds: float) -> str:
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
-
-def generate_srt(segments):
-    srt_output = ""
-    for i, segment in enumerate(segments):
-        start = format_timestamp(segment['start'])
-        end = format_timestamp(segment['end'])
-        text = segment['text'].strip()
-        srt_output += f"{i + 1}\n{start} --> {end}\n{text}\n\n"
-    return srt_output
+DEFAULT_MAX_LINE_CHARS = 42
+DEFAULT_MAX_LINES = 2
+DEFAULT_MIN_CUE_SECONDS = 1.0
+DEFAULT_MAX_CUE_SECONDS = 7.0
+SENTENCE_END = (".", "?", "!", "…")
 
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    # Work in whole milliseconds so that e.g. 1.9999 becomes 00:00:02,000
+    millis = max(0, round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{separator}{millis:03}"
+
+def format_srt_cue(index, segment):
+    start = format_timestamp(segment['start'])
+    end = format_timestamp(segment['end'])
+    text = segment['text'].strip()
+    return f"{index}\n{start} --> {end}\n{text}\n\n"
+
+def format_vtt_cue(segment):
+    start = format_timestamp(segment['start'], ".")
+    end = format_timestamp(segment['end'], ".")
+    text = segment['text'].strip()
+    return f"{start} --> {end}\n{text}\n\n"
+
+def segment_words(segment):
+    """Timed words of ``segment``.
+
+    Uses Whisper's word timestamps when the segment has them; otherwise the
+    segment's duration is spread over its words by their length.
+    """
+    if segment.get("words"):
+        return [
+            {"word": word["word"].strip(), "start": word["start"], "end": word["end"]}
+            for word in segment["words"] if word["word"].strip()
+        ]
+    tokens = segment["text"].split()
+    total = sum(len(token) for token in tokens)
+    start = segment["start"]
+    duration = max(segment["end"] - start, 0.0)
+    words = []
+    position = 0
+    for token in tokens:
+        word_start = start + duration * position / total
+        position += len(token)
+        words.append({"word": token, "start": word_start, "end": start + duration * position / total})
+    return words
+
+
+class CueBuilder:
+    """Splits segments into readable subtitle cues in a single pass over their words.
+
+    A cue has at most ``max_lines`` lines of at most ``max_line_chars``
+    characters (a longer single word gets a line of its own), lasts at most
+    ``max_duration`` seconds and ends after a sentence once it is
+    ``min_duration`` long. Cues never span segments. Shorter cues are
+    stretched to ``min_duration`` where the next cue leaves room, so each cue
+    is held back until the next one starts; ``flush`` releases the last one.
+    """
+
+    def __init__(self, max_line_chars=DEFAULT_MAX_LINE_CHARS, max_lines=DEFAULT_MAX_LINES,
+                 min_duration=DEFAULT_MIN_CUE_SECONDS, max_duration=DEFAULT_MAX_CUE_SECONDS):
+        self.max_line_chars = max_line_chars
+        self.max_lines = max_lines
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self._pending = None
+
+    def add_segment(self, segment):
+        """Return the cues completed by ``segment``."""
+        cues = []
+        lines = [[]]
+        length = 0
+        start = end = None
+        for word in segment_words(segment):
+            text = word["word"]
+            if start is not None:
+                sentence_done = lines[-1][-1].endswith(SENTENCE_END) and end - start >= self.min_duration
+                if sentence_done or word["end"] - start > self.max_duration:
+                    cues += self._finish(start, end, lines)
+                    lines, length, start = [[]], 0, None
+                elif length + 1 + len(text) > self.max_line_chars:
+                    if len(lines) == self.max_lines:
+                        cues += self._finish(start, end, lines)
+                        lines, length, start = [[]], 0, None
+                    else:
+                        lines.append([])
+                        length = 0
+            if start is None:
+                start = word["start"]
+            length += len(text) + (1 if lines[-1] else 0)
+            lines[-1].append(text)
+            end = max(word["end"], start)
+        if start is not None:
+            cues += self._finish(start, end, lines)
+        return cues
+
+    def flush(self):
+        cue, self._pending = self._pending, None
+        return [self._release(cue, None)] if cue else []
+
+    def _finish(self, start, end, lines):
+        cue = {"start": start, "end": end, "text": "\n".join(" ".join(line) for line in lines)}
+        released = [self._release(self._pending, start)] if self._pending else []
+        self._pending = cue
+        return released
+
+    def _release(self, cue, next_start):
+        if cue["end"] - cue["start"] < self.min_duration:
+            target = cue["start"] + self.min_duration
+            cue["end"] = target if next_start is None else max(cue["end"], min(target, next_start))
+        return cue
+
+
+def build_cues(segments, **cue_options):
+    """Yield the cues of ``segments``; ``cue_options`` are ``CueBuilder`` arguments."""
+    builder = CueBuilder(**cue_options)
+    for segment in segments:
+        yield from builder.add_segment(segment)
+    yield from builder.flush()
+
+def generate_srt(segments, **cue_options):
+    return "".join(format_srt_cue(i + 1, cue) for i, cue in enumerate(build_cues(segments, **cue_options)))
+
+def generate_vtt(segments, **cue_options):
+    return "WEBVTT\n\n" + "".join(format_vtt_cue(cue) for cue in build_cues(segments, **cue_options))
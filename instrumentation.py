@@ -0,0 +1,135 @@
+# instrumentation.py
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class FileProgress:
+    """Emits structured events while one file is transcribed.
+
+    Every event is a dict with ``event``, ``file``, ``time`` (Unix time) and
+    ``elapsed`` (seconds since the file was started) plus event-specific
+    fields. Stages emit a ``"start"`` and an ``"end"`` phase; the end carries
+    the stage duration as ``seconds``, which is also summed in ``timings``.
+    """
+
+    def __init__(self, filepath, callback=None, audio_seconds=0.0):
+        self.filepath = filepath
+        self.callback = callback
+        self.audio_seconds = audio_seconds
+        self.timings = {}
+        self.segments = 0
+        self._started = time.perf_counter()
+        self._inference_started = None
+        self._audio_offset = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def emit(self, event, **fields):
+        if self.callback is None:
+            return
+        fields.update(event=event, file=self.filepath, time=time.time(), elapsed=round(self.elapsed(), 3))
+        self.callback(fields)
+
+    def add_time(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, event, **fields):
+        self.emit(event, phase="start", **fields)
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        self.add_time(event, seconds)
+        self.emit(event, phase="end", seconds=round(seconds, 4), **fields)
+
+    def begin_inference(self, audio_offset=0.0):
+        """Start the clock for ETA estimates; ``audio_offset`` is audio already done (on resume)."""
+        self._inference_started = time.perf_counter()
+        self._audio_offset = audio_offset
+
+    def exclude_time(self, seconds):
+        """Leave ``seconds`` (e.g. time spent paused) out of the ETA estimate."""
+        if self._inference_started is not None:
+            self._inference_started += seconds
+
+    def segment(self, audio_processed, incremental=True):
+        """Report that transcription has reached ``audio_processed`` seconds of the recording.
+
+        Segments of a file transcribed in one piece arrive only after
+        inference; they are counted (``incremental=False``) but reported as
+        part of the write stage, without progress events or ETAs.
+        """
+        self.segments += 1
+        if not incremental:
+            return
+        fraction = min(audio_processed / self.audio_seconds, 1.0) if self.audio_seconds else None
+        eta = None
+        if fraction is not None and self._inference_started is not None:
+            done = audio_processed - self._audio_offset
+            if done > 0:
+                spent = time.perf_counter() - self._inference_started
+                eta = round(max(self.audio_seconds - audio_processed, 0.0) * spent / done, 1)
+        self.emit(
+            "progress",
+            audio_processed=round(audio_processed, 2),
+            audio_seconds=round(self.audio_seconds, 2),
+            fraction=round(fraction, 4) if fraction is not None else None,
+            eta_seconds=eta,
+            segments=self.segments,
+        )
+
+    def summary(self):
+        elapsed = self.elapsed()
+        return {
+            "elapsed": round(elapsed, 3),
+            "audio_seconds": round(self.audio_seconds, 2),
+            "segments": self.segments,
+            "real_time_factor": round(elapsed / self.audio_seconds, 4) if self.audio_seconds else None,
+            "timings": {stage: round(seconds, 4) for stage, seconds in self.timings.items()},
+        }
+
+
+class JsonlEventLog:
+    """Event callback appending one JSON object per line to ``path``.
+
+    Lines are written with a single call on a file opened for appending, so
+    several processes can share one log.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def fan_out(*callbacks):
+    """Combine event callbacks, skipping None."""
+    callbacks = [callback for callback in callbacks if callback is not None]
+
+    def emit(event):
+        for callback in callbacks:
+            callback(event)
+    return emit
+
+
+def format_eta(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
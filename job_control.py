@@ -0,0 +1,46 @@
+# job_control.py
+import threading
+
+
+class TranscriptionCancelled(Exception):
+    pass
+
+
+class JobControl:
+    """Pause/cancel switch shared between a UI and a transcription worker.
+
+    The worker calls ``checkpoint`` between segments; it blocks there while
+    the job is paused and raises ``TranscriptionCancelled`` once cancelled.
+    """
+
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = threading.Event()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def wait(self, seconds):
+        """Sleep for ``seconds`` unless the job is cancelled first; returns True if it was."""
+        return self._cancelled.wait(seconds)
+
+    def checkpoint(self):
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise TranscriptionCancelled()
@@ -0,0 +1,192 @@
+# job_manifest.py
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT NOT NULL,
+    filepath TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    options TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    outputs TEXT,
+    summary TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+)
+"""
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after ``attempts`` failures (exponential backoff)."""
+    return min(RETRY_BASE_SECONDS * 4 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+class Job:
+    def __init__(self, row):
+        self.id = row["id"]
+        self.batch = row["batch"]
+        self.filepath = row["filepath"]
+        self.output_dir = row["output_dir"]
+        self.options = json.loads(row["options"])
+        self.state = row["state"]
+        self.attempts = row["attempts"]
+        # Set once the job first ran; only then can it have left partial outputs
+        self.started = row["started"]
+        self.next_attempt = row["next_attempt"]
+        self.error = row["error"]
+        self.outputs = json.loads(row["outputs"]) if row["outputs"] else []
+        self.summary = json.loads(row["summary"]) if row["summary"] else None
+
+    def __repr__(self):
+        return f"Job({self.id}, {self.filepath!r}, {self.state})"
+
+
+class JobManifest:
+    """Persistent record of batch transcription jobs in a SQLite file.
+
+    Every file of a batch is a row with its state (pending, running, done or
+    failed), the model and options it runs with, its output paths and
+    timings. Opening the manifest returns jobs left ``running`` by a crashed
+    process to ``pending``. Failed jobs are retried with exponential backoff
+    until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+            db.execute("UPDATE jobs SET state = ? WHERE state = ?", (PENDING, RUNNING))
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation, so the manifest can be
+        # used from any thread
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _query(self, sql, params=()):
+        with self._connect() as db:
+            return [Job(row) for row in db.execute(sql, params)]
+
+    def add_batch(self, filepaths, output_dir, options, skip_done=False):
+        """Record a new batch and return its id.
+
+        A file still queued with the same output directory and options joins
+        the batch instead of being added twice; with ``skip_done`` so does one
+        that was already transcribed.
+        """
+        batch = uuid.uuid4().hex
+        encoded = json.dumps(options, sort_keys=True)
+        now = time.time()
+        with self._connect() as db:
+            for filepath in filepaths:
+                filepath = os.path.abspath(filepath)
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE filepath = ? AND output_dir = ? AND options = ? ORDER BY id DESC",
+                    (filepath, output_dir, encoded),
+                ).fetchone()
+                if row and (self._is_unfinished(Job(row)) or (skip_done and row["state"] == DONE)):
+                    db.execute("UPDATE jobs SET batch = ? WHERE id = ?", (batch, row["id"]))
+                    continue
+                db.execute(
+                    "INSERT INTO jobs (batch, filepath, output_dir, options, state, created) VALUES (?, ?, ?, ?, ?, ?)",
+                    (batch, filepath, output_dir, encoded, PENDING, now),
+                )
+        return batch
+
+    def resume_unfinished(self):
+        """Gather the unfinished jobs of all earlier batches into a new batch; returns its id or None."""
+        jobs = self.unfinished()
+        if not jobs:
+            return None
+        batch = uuid.uuid4().hex
+        with self._connect() as db:
+            db.executemany("UPDATE jobs SET batch = ? WHERE id = ?", [(batch, job.id) for job in jobs])
+        return batch
+
+    def jobs(self, batch=None):
+        if batch is None:
+            return self._query("SELECT * FROM jobs ORDER BY id")
+        return self._query("SELECT * FROM jobs WHERE batch = ? ORDER BY id", (batch,))
+
+    def unfinished(self, batch=None):
+        """Jobs that still have to run: pending, running or failed with attempts left."""
+        return [job for job in self.jobs(batch) if self._is_unfinished(job)]
+
+    def _is_unfinished(self, job):
+        return job.state in (PENDING, RUNNING) or (job.state == FAILED and job.attempts < self.max_attempts)
+
+    def ready(self, batch=None, now=None):
+        """Unfinished jobs that may start now (their retry delay has passed)."""
+        now = time.time() if now is None else now
+        return [
+            job for job in self.unfinished(batch)
+            if job.state != RUNNING and job.next_attempt <= now
+        ]
+
+    def next_retry_in(self, batch=None, now=None):
+        """Seconds until the next failed job may be retried, or None if none is waiting."""
+        now = time.time() if now is None else now
+        waiting = [job.next_attempt for job in self.unfinished(batch) if job.state == FAILED]
+        return max(min(waiting) - now, 0.0) if waiting else None
+
+    def mark_running(self, job_id):
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET state = ?, started = ? WHERE id = ?", (RUNNING, time.time(), job_id))
+
+    def mark_done(self, job_id, summary=None):
+        summary = summary or {}
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET state = ?, error = NULL, outputs = ?, summary = ?, finished = ? WHERE id = ?",
+                (DONE, json.dumps(summary.get("outputs", [])), json.dumps(summary), time.time(), job_id),
+            )
+
+    def mark_failed(self, job_id, error):
+        """Record a failed attempt; returns the delay before the retry, or None once attempts are used up."""
+        with self._connect() as db:
+            attempts = db.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()["attempts"] + 1
+            delay = retry_delay(attempts) if attempts < self.max_attempts else None
+            db.execute(
+                "UPDATE jobs SET state = ?, attempts = ?, error = ?, next_attempt = ?, finished = ? WHERE id = ?",
+                (FAILED, attempts, str(error), time.time() + (delay or 0), time.time(), job_id),
+            )
+        return delay
+
+    def mark_pending(self, job_id):
+        """Put a job back in the queue without counting an attempt (e.g. after a cancel)."""
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET state = ? WHERE id = ?", (PENDING, job_id))
+
+    def counts(self, batch=None):
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self.jobs(batch):
+            counts[job.state] += 1
+        return counts
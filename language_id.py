@@ -0,0 +1,69 @@
+# language_id.py
+import logging
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, stream_audio
+
+AUTO = "auto"
+# Whisper decides the language from one 30 s log-mel window
+DETECTION_SECONDS = 30.0
+# Below this probability a detected language is flagged for review
+DEFAULT_MIN_CONFIDENCE = 0.5
+
+
+def load_head(filepath, seconds=DETECTION_SECONDS):
+    """Decode only the first ``seconds`` of ``filepath``."""
+    window = next(stream_audio(filepath, seconds, 0.0), None)
+    return window[1] if window is not None else np.zeros(0, dtype=np.float32)
+
+
+def detect_language(model, samples):
+    """Return ``(language, probability)`` for the first 30 s of ``samples``."""
+    return detect_languages(model, [samples])[0]
+
+
+def detect_languages(model, clips):
+    """Run Whisper's language head on the first window of every clip in one batch.
+
+    English-only models always report ``("en", 1.0)``.
+    """
+    from backends import FasterWhisperModel
+
+    if isinstance(model, FasterWhisperModel):
+        return [model.detect_language(clip[:int(DETECTION_SECONDS * SAMPLE_RATE)]) for clip in clips]
+    if not model.is_multilingual:
+        return [("en", 1.0)] * len(clips)
+
+    import torch
+    import whisper
+
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(clip[:int(DETECTION_SECONDS * SAMPLE_RATE)]), n_mels=model.dims.n_mels
+        )
+        for clip in clips
+    ]).to(model.device).to(next(model.parameters()).dtype)
+    _, probabilities = model.detect_language(mels)
+    results = []
+    for probs in probabilities:
+        language = max(probs, key=probs.get)
+        results.append((language, float(probs[language])))
+    return results
+
+
+def language_info(language, probability, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """The record kept in summaries, cached results and JSON outputs."""
+    return {
+        "language": language,
+        "probability": round(probability, 4),
+        "low_confidence": probability < min_confidence,
+    }
+
+
+def log_detection(filepath, info):
+    if info["low_confidence"]:
+        logging.warning("Language of %s is uncertain: %s with probability %.2f, please check the transcript",
+                        filepath, info["language"], info["probability"])
+    else:
+        logging.info("Detected language %s (%.2f) for %s", info["language"], info["probability"], filepath)
@@ -1,18 +1,35 @@
 # main_app.py
+import time
+# Taken before the remaining imports so that time-to-window includes them
+_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, PhotoImage
 import threading
-from transcriber import transcribe_audio_file
+import queue
+from contextlib import ExitStack
+# Modules that pull in numpy, torch or whisper are imported by the worker
+# thread when a transcription starts, so the window appears immediately.
+from model_cache import MODEL_MAPPING, cache_stats, default_cache, get_model
+from backends import DEFAULT_BACKEND
+from result_cache import default_result_cache
+from instrumentation import JsonlEventLog, fan_out, format_eta
+from job_control import JobControl, TranscriptionCancelled
+from job_manifest import JobManifest
+from scheduler import InsufficientMemory, model_memory_mb, plan_resources
 import os
 import json
 import logging
-import shutil
-import tempfile
 import sys
 import webbrowser
 from translations import translations
 
 SETTINGS_FILE = "settings.json"
+EVENT_LOG_FILE = "events.jsonl"
+MANIFEST_FILE = "jobs.sqlite"
+# Share of a file's progress bar reached when a stage starts; files that are
+# not decoded window by window only report these stages
+STAGE_PROGRESS = {"model_load": 0.0, "decode": 0.05, "language_detection": 0.1, "inference": 0.15, "write": 0.9}
 
 logging.basicConfig(
     filename="app.log",
@@ -44,29 +61,18 @@ class TranscriptionApp:
         self.root.option_add("*Font", ("Arial", 11))
 
         # Model mapping from display names to Whisper model names
-        self.model_mapping = {
-            # German display names
-            "winzig": "tiny",
-            "mittel": "medium",
-            "mittelgroß (effizienter)": "turbo",
-            "groß": "large",
-            "groß (neuere Version)": "large-v3",
-            
-            # English display names
-            "tiny": "tiny",
-            "medium": "medium",
-            "medium (efficient)": "turbo",
-            "large": "large",
-            "large (newer version)": "large-v3"
-        }
+        self.model_mapping = MODEL_MAPPING
 
         self.audio_files = []
         self.output_dir = tk.StringVar()
 
         self.model_choice = tk.StringVar(value="tiny")
         self.language_choice = tk.StringVar(value="de")
+        self.backend = DEFAULT_BACKEND
+        self.backend_choice = tk.StringVar()
         self.punctuate = tk.BooleanVar()
         self.include_srt = tk.BooleanVar()
+        self.skip_silence = tk.BooleanVar()
 
         self.logo_image = PhotoImage(file=resource_path("UK_Logo_white.png")).subsample(2, 2)
         self.aw_logo = PhotoImage(file=resource_path("AW_logo.png")).subsample(2, 2)
@@ -75,12 +81,32 @@ class TranscriptionApp:
         self.model_choice.set(settings.get("model", "tiny"))
         self.output_dir.set(settings.get("output_dir", ""))
         self.language_choice.set(settings.get("language", "de"))
+        self.backend = settings.get("backend", DEFAULT_BACKEND)
         self.punctuate.set(settings.get("punctuate", False))
         self.include_srt.set(settings.get("include_srt", False))
+        self.skip_silence.set(settings.get("skip_silence", False))
         self.current_lang.set(settings.get("language_ui", "en"))
 
+        self.event_log = JsonlEventLog(EVENT_LOG_FILE)
+        # Batches are recorded here so an interrupted one can be resumed
+        self.manifest = JobManifest(MANIFEST_FILE)
+        # The worker thread never touches Tk; it posts messages that the
+        # mainloop picks up in poll_worker_queue.
+        self.worker_queue = queue.Queue()
+        self.job_control = None
+        self.batch_size = 1
+
+        # Preloads run one at a time; one superseded by a newer selection is skipped
+        self.preload_lock = threading.Lock()
+        self.preload_generation = 0
+
+        self.window_shown = False
+        self.started_at = None
+        self.first_segment_seen = False
+
         self._build_ui()
         self.update_ui_language()
+        self.root.bind("<Map>", self.on_window_shown, add="+")
 
     def _build_ui(self):
         style = ttk.Style()
@@ -171,11 +197,18 @@ class TranscriptionApp:
         self.model_label.pack(anchor="w", pady=(10, 0))
         self.model_combobox = ttk.Combobox(frm, textvariable=self.model_choice, width=25)
         self.model_combobox.pack(pady=(0, 10))
+        self.model_combobox.bind("<<ComboboxSelected>>", lambda e: self.preload_model())
         self.update_model_options()
 
+        self.backend_label = ttk.Label(frm, text="")
+        self.backend_label.pack(anchor="w")
+        self.backend_combobox = ttk.Combobox(frm, textvariable=self.backend_choice, state="readonly", width=35)
+        self.backend_combobox.pack(pady=(0, 10))
+        self.backend_combobox.bind("<<ComboboxSelected>>", self.on_backend_selected)
+
         self.language_label = ttk.Label(frm, text="")
         self.language_label.pack(anchor="w")
-        self.language_combobox = ttk.Combobox(frm, textvariable=self.language_choice, values=["de", "en", "fr", "es", "it"], width=25)
+        self.language_combobox = ttk.Combobox(frm, textvariable=self.language_choice, values=["auto", "de", "en", "fr", "es", "it"], width=25)
         self.language_combobox.pack(pady=(0, 10))
 
         self.language_note = ttk.Label(frm, text="", wraplength=650, justify="left")
@@ -201,11 +234,36 @@ class TranscriptionApp:
         self.srt_info = ttk.Label(frm, text="", wraplength=650, justify="left")
         self.srt_info.pack_forget()
 
-        self.start_btn = ttk.Button(frm, text="", command=self.start_transcription)
-        self.start_btn.pack(pady=10)
+        vad_frame = ttk.Frame(frm)
+        vad_frame.pack(anchor="w", pady=3)
+        self.vad_cb = ttk.Checkbutton(vad_frame, variable=self.skip_silence)
+        self.vad_cb.pack(side="left")
+        self.vad_info_btn = ttk.Button(vad_frame, text="?", width=2, command=self.toggle_vad_info)
+        self.vad_info_btn.pack(side="left", padx=5)
+
+        self.vad_info = ttk.Label(frm, text="", wraplength=650, justify="left")
+        self.vad_info.pack_forget()
+
+        control_frame = ttk.Frame(frm)
+        control_frame.pack(pady=10)
+        self.start_btn = ttk.Button(control_frame, text="", command=self.start_transcription)
+        self.start_btn.pack(side="left", padx=5)
+        self.pause_btn = ttk.Button(control_frame, text="", command=self.toggle_pause, state="disabled")
+        self.pause_btn.pack(side="left", padx=5)
+        self.cancel_btn = ttk.Button(control_frame, text="", command=self.cancel_transcription, state="disabled")
+        self.cancel_btn.pack(side="left", padx=5)
+        self.resume_batch_btn = ttk.Button(frm, text="", command=self.resume_unfinished)
 
         self.status_label = ttk.Label(frm, text="", foreground="lightgreen")
-        self.status_label.pack(pady=10)
+        self.status_label.pack(pady=(10, 5))
+
+        self.progress_bar = ttk.Progressbar(frm, orient="horizontal", length=400, mode="determinate", maximum=100)
+        self.progress_bar.pack(pady=5)
+        self.progress_label = ttk.Label(frm, text="")
+        self.progress_label.pack(pady=(0, 10))
+
+        self.errors_label = ttk.Label(frm, text="", foreground="tomato", wraplength=650, justify="left")
+        self.errors_label.pack(pady=(0, 10))
 
         self.copyright_label = ttk.Label(frm, text="", font=("Arial", 8))
         self.copyright_label.pack(side="bottom", pady=10)
@@ -219,8 +277,11 @@ class TranscriptionApp:
         # Try to preserve current selection if it exists in new options
         current_val = self.model_choice.get()
         if current_val not in trans["model_options"]:
-            # Reset to first option if current not available
-            self.model_choice.set(trans["model_options"][0])
+            # Show the same model under its name in this language (settings
+            # store the Whisper name), otherwise reset to the first option
+            actual = self.model_mapping.get(current_val, current_val)
+            matches = [option for option in trans["model_options"] if self.model_mapping.get(option) == actual]
+            self.model_choice.set(matches[0] if matches else trans["model_options"][0])
     
     def set_language(self, lang):
         self.current_lang.set(lang)
@@ -232,9 +293,64 @@ class TranscriptionApp:
             "language": self.language_choice.get(),
             "punctuate": self.punctuate.get(),
             "include_srt": self.include_srt.get(),
+            "skip_silence": self.skip_silence.get(),
+            "backend": self.backend,
             "language_ui": lang
         })
 
+    def on_backend_selected(self, event=None):
+        names = translations[self.current_lang.get()]["backend_names"]
+        for backend, name in names.items():
+            if name == self.backend_choice.get():
+                self.backend = backend
+        self.preload_model()
+
+    def on_window_shown(self, event):
+        if event.widget is not self.root or self.window_shown:
+            return
+        self.window_shown = True
+        seconds = time.perf_counter() - _STARTED
+        logging.info("Window shown %.2fs after start", seconds)
+        self.event_log({"event": "time_to_window", "time": time.time(), "seconds": round(seconds, 3)})
+        # Warm up the model restored from settings.json while the user picks files
+        self.root.after_idle(self.preload_model)
+
+    def preload_model(self):
+        """Load the selected model in the background so the first file does not wait for it."""
+        if self.job_control is not None:
+            return
+        model_display = self.model_choice.get()
+        model_actual = self.model_mapping.get(model_display, model_display)
+        self.preload_generation += 1
+        threading.Thread(target=self._preload, args=(model_actual, self.backend, self.preload_generation),
+                         daemon=True).start()
+
+    def _preload(self, model_name, backend, generation):
+        with self.preload_lock:
+            if generation == self.preload_generation and self.job_control is None:
+                self._preload_model(model_name, backend)
+
+    def _preload_model(self, model_name, backend):
+        if default_cache().contains(model_name, backend=backend):
+            return
+        try:
+            self.plan_model(model_name, backend, allow_downgrade=False)
+        except InsufficientMemory as e:
+            # Starting the job will offer a smaller model
+            logging.warning("Not preloading %s: %s", model_name, e)
+            return
+        self.make_room(model_name, backend)
+        start = time.perf_counter()
+        try:
+            get_model(model_name, backend=backend)
+        except Exception as e:
+            logging.warning("Preloading model %s failed: %s", model_name, e)
+            return
+        seconds = time.perf_counter() - start
+        logging.info("Preloaded model %s (%s) in %.2fs", model_name, backend, seconds)
+        self.event_log({"event": "preload", "time": time.time(), "model": model_name, "backend": backend,
+                        "seconds": round(seconds, 3)})
+
     def update_ui_language(self):
         lang = self.current_lang.get()
         trans = translations[lang]
@@ -251,15 +367,23 @@ class TranscriptionApp:
         self.output_dir_label.config(text=trans["output_dir"])
         self.model_label.config(text=trans["model"])
         self.language_label.config(text=trans["language"])
+        self.backend_label.config(text=trans["backend"])
+        self.backend_combobox['values'] = list(trans["backend_names"].values())
+        self.backend_choice.set(trans["backend_names"].get(self.backend, trans["backend_names"][DEFAULT_BACKEND]))
         self.language_note.config(text=trans["language_note"])
         self.punctuate_cb.config(text=trans["punctuate"])
         self.srt_cb.config(text=trans["srt"])
+        self.vad_cb.config(text=trans["vad"])
         self.start_btn.config(text=trans["start"])
+        self.pause_btn.config(text=trans["resume"] if self.job_control and self.job_control.paused else trans["pause"])
+        self.cancel_btn.config(text=trans["cancel"])
+        self.update_resume_button()
         self.copyright_label.config(text=trans["copyright"])
         self.select_files_btn.config(text=trans["select_files"])
         self.browse_btn.config(text=trans["browse"])
         self.punctuate_info_btn.config(text=trans["info"])
         self.srt_info_btn.config(text=trans["info"])
+        self.vad_info_btn.config(text=trans["info"])
         
         # Update combobox values
         self.model_combobox['values'] = trans["model_options"]
@@ -267,10 +391,12 @@ class TranscriptionApp:
         # Update info text
         self.punctuate_info.config(text=trans["punctuate_info"])
         self.srt_info.config(text=trans["srt_info"])
+        self.vad_info.config(text=trans["vad_info"])
 
     def hide_all_info(self):
         self.punctuate_info.pack_forget()
         self.srt_info.pack_forget()
+        self.vad_info.pack_forget()
 
     def toggle_description(self):
         lang = self.current_lang.get()
@@ -293,6 +419,11 @@ class TranscriptionApp:
         if not self.srt_info.winfo_ismapped():
             self.srt_info.pack()
 
+    def toggle_vad_info(self):
+        self.hide_all_info()
+        if not self.vad_info.winfo_ismapped():
+            self.vad_info.pack()
+
     def select_files(self):
         lang = self.current_lang.get()
         files = filedialog.askopenfilenames(filetypes=[("Audio Files", "*.wav *.mp3 *.m4a *.mp4 *.mov *.ogg")])
@@ -320,52 +451,393 @@ class TranscriptionApp:
         # Map displayed model name to actual Whisper model name
         model_display = self.model_choice.get()
         model_actual = self.model_mapping.get(model_display, model_display)
-        
+
         save_settings({
             "model": model_actual,
             "output_dir": self.output_dir.get(),
             "language": self.language_choice.get(),
             "punctuate": self.punctuate.get(),
             "include_srt": self.include_srt.get(),
+            "skip_silence": self.skip_silence.get(),
+            "backend": self.backend,
             "language_ui": lang
         })
 
-        self.status_label.config(text=translations[lang]["processing"].format(""), foreground="orange")
-        threading.Thread(target=self.run_transcription, daemon=True).start()
+        # Tk variables are read here, on the main thread, and handed to the worker
+        options = {
+            "model_name": model_actual,
+            "language": self.language_choice.get(),
+            "apply_punctuation": self.punctuate.get(),
+            "generate_srt_file": self.include_srt.get(),
+            "vad": self.skip_silence.get(),
+            "backend": self.backend,
+        }
+        files = list(self.audio_files)
+        output_dir = self.output_dir.get()
+
+        def run(plans):
+            batch = self.manifest.add_batch(files, output_dir, dict(options, model_name=plans[0].model_name))
+            self.run_batch(batch, plans[0].threads)
+
+        self.check_memory([(model_actual, self.backend)], run)
+
+    def resume_unfinished(self):
+        """Run the jobs a crashed, closed or cancelled session left unfinished."""
+        if self.job_control is not None:
+            return
+        models = sorted({(job.options["model_name"], job.options["backend"]) for job in self.manifest.unfinished()})
+
+        def run(plans):
+            batch = self.manifest.resume_unfinished()
+            if batch is not None:
+                self.run_batch(batch, min((plan.threads for plan in plans), default=None))
+
+        self.check_memory(models, run, allow_downgrade=False)
+
+    def plan_model(self, model_name, backend, allow_downgrade=True):
+        """Resource plan for one worker; a different cached model counts as free since it is unloaded first.
+
+        Waits for a model still being loaded (e.g. by a preload), so that it
+        is counted either as the resident model or as reclaimable memory.
+        """
+        cache = default_cache()
+        cache.wait_for_loads()
+        resident = cache.contains(model_name, backend=backend)
+        reclaimable = 0.0 if resident else cache.resident_bytes() / (1024 * 1024)
+        return plan_resources(model_name, backend, resident=resident, reclaimable_mb=reclaimable,
+                              allow_downgrade=allow_downgrade)
+
+    def make_room(self, model_name, backend):
+        # The cache holds one model; unloading the old one before loading the
+        # new one avoids having both in memory at once. A model still loading
+        # is only in the cache once its load finished.
+        cache = default_cache()
+        cache.wait_for_loads()
+        if not cache.contains(model_name, backend=backend):
+            cache.clear()
+
+    def check_memory(self, models, then, allow_downgrade=True):
+        """Plan ``models`` (model, backend pairs) against free memory in a background thread.
+
+        Planning looks into the model cache and imports torch, so it stays off
+        the Tk thread; ``apply_plans`` continues with the result there.
+        """
+        self.start_btn.config(state="disabled")
+        self.resume_batch_btn.config(state="disabled")
+
+        def plan():
+            plans, refused = [], None
+            for model_name, backend in models:
+                try:
+                    plans.append(self.plan_model(model_name, backend, allow_downgrade))
+                except InsufficientMemory as e:
+                    refused = (model_name, e)
+                    break
+            self.worker_queue.put(("plans", plans, refused, then))
+
+        threading.Thread(target=plan, daemon=True).start()
+        self.root.after(100, self.poll_worker_queue)
+
+    def apply_plans(self, plans, refused, then):
+        """Refuse models that do not fit and offer smaller ones, then call ``then(plans)`` unless declined."""
+        trans = translations[self.current_lang.get()]
+        self.start_btn.config(state="normal")
+        self.resume_batch_btn.config(state="normal")
+        if refused is not None:
+            model_name, e = refused
+            logging.warning("Not starting %s: %s", model_name, e)
+            messagebox.showerror(trans["memory_title"], trans["memory_refused"].format(
+                model=model_name, need=e.need_mb / 1024, available=e.budget_mb / 1024
+            ))
+            return
+        for plan in plans:
+            for warning in plan.warnings:
+                logging.warning(warning)
+            if plan.downgraded:
+                use_smaller = messagebox.askyesno(trans["memory_title"], trans["memory_downgrade"].format(
+                    model=plan.requested_model, need=model_memory_mb(plan.requested_model, plan.backend) / 1024,
+                    available=plan.budget_mb / 1024, smaller=plan.model_name,
+                ))
+                if not use_smaller:
+                    return
+        then(plans)
+
+    def update_resume_button(self):
+        """Show the resume button while the manifest holds unfinished jobs and nothing runs."""
+        unfinished = len(self.manifest.unfinished()) if self.job_control is None else 0
+        if unfinished:
+            self.resume_batch_btn.config(
+                text=translations[self.current_lang.get()]["resume_batch"].format(unfinished)
+            )
+            self.resume_batch_btn.pack(before=self.status_label, pady=(0, 5))
+        else:
+            self.resume_batch_btn.pack_forget()
 
-    def run_transcription(self):
+    def run_batch(self, batch, threads=None):
         lang = self.current_lang.get()
-        for file in self.audio_files:
+        self.job_control = JobControl()
+        self.batch_size = len(self.manifest.jobs(batch))
+        self.update_resume_button()
+        self.start_btn.config(state="disabled")
+        self.pause_btn.config(state="normal", text=translations[lang]["pause"])
+        self.cancel_btn.config(state="normal")
+        self.errors_label.config(text="")
+        self.reset_progress()
+        self.started_at = time.time()
+        self.first_segment_seen = False
+        self.status_label.config(text=translations[lang]["processing"].format(""), foreground="orange")
+        threading.Thread(
+            target=self.run_transcription,
+            args=(batch, self.job_control, threads),
+            daemon=True,
+        ).start()
+        self.root.after(100, self.poll_worker_queue)
+
+    def toggle_pause(self):
+        trans = translations[self.current_lang.get()]
+        if self.job_control.paused:
+            self.job_control.resume()
+            self.pause_btn.config(text=trans["pause"])
+            self.progress_label.config(text=trans["progress_inference"])
+        else:
+            self.job_control.pause()
+            self.pause_btn.config(text=trans["resume"])
+            self.progress_label.config(text=trans["paused"])
+
+    def cancel_transcription(self):
+        self.job_control.cancel()
+        self.pause_btn.config(state="disabled")
+        self.cancel_btn.config(state="disabled")
+        self.progress_label.config(text=translations[self.current_lang.get()]["cancelling"])
+
+    def run_transcription(self, batch, control, threads=None):
+        """Worker thread: runs the manifest jobs of ``batch`` and reports through ``worker_queue`` only.
+
+        Failed files are retried with the manifest's backoff until they succeed
+        or run out of attempts.
+        """
+        from clip_batching import plan_batches
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        indices = {job.id: i for i, job in enumerate(self.manifest.jobs(batch))}
+        while not control.cancelled:
+            jobs = self.manifest.ready(batch)
+            if not jobs:
+                delay = self.manifest.next_retry_in(batch)
+                if delay is None:
+                    break
+                self.worker_queue.put(("retry_wait", delay))
+                control.wait(delay)
+                continue
+            # Files of a batch share output folder and options, unless
+            # unfinished batches were gathered for resuming
+            by_settings = {}
+            for job in jobs:
+                by_settings.setdefault((job.output_dir, json.dumps(job.options, sort_keys=True)), []).append(job)
+            for settings_jobs in by_settings.values():
+                options = settings_jobs[0].options
+                self.make_room(options["model_name"], options["backend"])
+                by_path = {job.filepath: job for job in settings_jobs}
+                # Short clips are decoded several at a time
+                for group in plan_batches(list(by_path)):
+                    if control.cancelled:
+                        break
+                    group_jobs = [by_path[path] for path in group]
+                    if len(group_jobs) > 1:
+                        self.run_clip_batch(group_jobs, indices, control)
+                    else:
+                        self.run_job(group_jobs[0], indices[group_jobs[0].id], control)
+
+        logging.info("Model cache stats: %s", cache_stats())
+        logging.info("Result cache stats: %s", default_result_cache().stats())
+        jobs = self.manifest.jobs(batch)
+        finished = sum(job.state == "done" for job in jobs)
+        errors = [(os.path.basename(job.filepath), job.error) for job in jobs if job.state == "failed"]
+        uncertain = [
+            (os.path.basename(job.filepath), job.summary["language_detection"])
+            for job in jobs
+            if job.state == "done" and (job.summary.get("language_detection") or {}).get("low_confidence")
+        ]
+        self.worker_queue.put(("done", finished, errors, control.cancelled, uncertain))
+
+    def run_job(self, job, index, control):
+        from audio_io import prepared_input
+        from transcriber import transcribe_audio_file
+
+        logging.info("Starting transcription for: %s", job.filepath)
+        self.worker_queue.put(("file", index, os.path.basename(job.filepath)))
+        self.manifest.mark_running(job.id)
+        try:
+            # Recordings long enough to be decoded window by window report
+            # progress after every window, shorter ones per stage; an SRT left
+            # partial by an earlier attempt of this job is continued, any other
+            # partial output is discarded
+            with prepared_input(job.filepath) as local_path:
+                summary = transcribe_audio_file(
+                    local_path,
+                    job.output_dir,
+                    resume=job.started is not None,
+                    cache=default_result_cache(),
+                    on_event=fan_out(
+                        self.event_log,
+                        lambda event: self.worker_queue.put(("event", index, event)),
+                    ),
+                    control=control,
+                    **job.options
+                )
+        except TranscriptionCancelled:
+            logging.info("Cancelled transcription for: %s", job.filepath)
+            self.manifest.mark_pending(job.id)
+        except Exception as e:
+            self.record_failure(job, e)
+        else:
+            self.manifest.mark_done(job.id, summary)
+            logging.info("Finished transcription for: %s", job.filepath)
+
+    def run_clip_batch(self, jobs, indices, control):
+        """Transcribe a group of short clips together and record each outcome in the manifest."""
+        from audio_io import prepared_input
+        from clip_batching import transcribe_clip_batch
+
+        options = jobs[0].options
+        logging.info("Starting batched transcription for %d clips", len(jobs))
+        self.worker_queue.put(("file", indices[jobs[0].id], ", ".join(os.path.basename(j.filepath) for j in jobs)))
+        for job in jobs:
+            self.manifest.mark_running(job.id)
+        try:
+            with ExitStack() as stack:
+                local_paths = [stack.enter_context(prepared_input(job.filepath)) for job in jobs]
+                by_local = {path: indices[job.id] for path, job in zip(local_paths, jobs)}
+                outcomes = transcribe_clip_batch(
+                    local_paths,
+                    jobs[0].output_dir,
+                    cache=default_result_cache(),
+                    on_event=fan_out(
+                        self.event_log,
+                        lambda event: self.worker_queue.put(("event", by_local[event["file"]], event)),
+                    ),
+                    control=control,
+                    **options
+                )
+        except TranscriptionCancelled:
+            for job in jobs:
+                self.manifest.mark_pending(job.id)
+            return
+        except Exception as e:
+            for job in jobs:
+                self.record_failure(job, e)
+            return
+        for job, (_, summary, error) in zip(jobs, outcomes):
+            if error is not None:
+                self.record_failure(job, error)
+            else:
+                self.manifest.mark_done(job.id, summary)
+
+    def record_failure(self, job, error):
+        delay = self.manifest.mark_failed(job.id, error)
+        if delay is None:
+            logging.error("Error processing %s, giving up: %s", job.filepath, error)
+        else:
+            logging.error("Error processing %s, retrying in %.0f s: %s", job.filepath, delay, error)
+
+    def poll_worker_queue(self):
+        """Apply the worker's messages on the Tk thread; reschedules itself until the batch ends."""
+        while True:
             try:
-                temp_dir = tempfile.mkdtemp()
-                local_path = os.path.join(temp_dir, os.path.basename(file))
-                shutil.copy(file, local_path)
-
-                logging.info("Starting transcription for: %s", file)
-                
-                # Map displayed model name to actual Whisper model name
-                model_display = self.model_choice.get()
-                model_actual = self.model_mapping.get(model_display, model_display)
-                
+                message = self.worker_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == "file":
+                _, index, name = message
                 self.status_label.config(
-                    text=translations[lang]["processing"].format(os.path.basename(file)),
-                    foreground="orange"
+                    text=translations[self.current_lang.get()]["processing"].format(name), foreground="orange"
                 )
-                self.status_label.update_idletasks()
-
-                transcribe_audio_file(
-                    local_path,
-                    self.output_dir.get(),
-                    model_name=model_actual,
-                    language=self.language_choice.get(),
-                    apply_punctuation=self.punctuate.get(),
-                    generate_srt_file=self.include_srt.get()
+            elif kind == "event":
+                _, index, event = message
+                self.show_progress(event, index)
+            elif kind == "retry_wait":
+                self.progress_label.config(
+                    text=translations[self.current_lang.get()]["retry_wait"].format(round(message[1]))
                 )
-                logging.info("Finished transcription for: %s", file)
-            except Exception as e:
-                logging.error("Error processing %s: %s", file, str(e))
-                messagebox.showerror("Transcription Error", str(e))
-        self.status_label.config(text=translations[lang]["finished"], foreground="green")
+            elif kind == "plans":
+                self.apply_plans(*message[1:])
+                return
+            elif kind == "done":
+                self.show_summary(*message[1:])
+                return
+        self.root.after(100, self.poll_worker_queue)
+
+    def show_summary(self, finished, errors, cancelled, uncertain):
+        trans = translations[self.current_lang.get()]
+        self.job_control = None
+        self.update_resume_button()
+        self.start_btn.config(state="normal")
+        self.pause_btn.config(state="disabled", text=trans["pause"])
+        self.cancel_btn.config(state="disabled")
+        self.progress_label.config(text=trans["summary"].format(finished=finished, failed=len(errors)))
+        notes = []
+        if errors:
+            notes.append(trans["batch_errors"] + "\n" + "\n".join(f"{name}: {error}" for name, error in errors))
+        if uncertain:
+            notes.append(trans["uncertain_language"] + "\n" + "\n".join(
+                f"{name}: {info['language']} ({info['probability']:.0%})" for name, info in uncertain
+            ))
+        self.errors_label.config(text="\n\n".join(notes))
+        if cancelled:
+            self.status_label.config(text=trans["cancelled"], foreground="orange")
+        elif errors:
+            self.status_label.config(text=trans["finished_with_errors"], foreground="tomato")
+        else:
+            self.status_label.config(text=trans["finished"], foreground="green")
+
+    def reset_progress(self):
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="")
+
+    def set_file_progress(self, index, fraction):
+        # Stages and segments of one file only ever move the bar forward
+        value = (index + fraction) / self.batch_size * 100
+        self.progress_bar["value"] = max(float(self.progress_bar["value"]), value)
+
+    def show_progress(self, event, index):
+        """Render a transcriber event for file ``index`` of the current batch."""
+        trans = translations[self.current_lang.get()]
+        kind = event["event"]
+        stages = {"model_load": "progress_model_load", "decode": "progress_decode", "inference": "progress_inference",
+                  "language_detection": "progress_language_detection", "write": "progress_write"}
+        text = None
+        # Files transcribed in one piece have their first segment when writing starts
+        first_segment = kind == "progress" or (kind == "write" and event.get("phase") == "start")
+        if first_segment and not self.first_segment_seen:
+            self.first_segment_seen = True
+            seconds = event["time"] - self.started_at
+            logging.info("First segment %.2fs after start of transcription", seconds)
+            self.event_log({"event": "time_to_first_segment", "time": time.time(), "seconds": round(seconds, 3)})
+
+        if kind in stages and event.get("phase") == "start":
+            text = trans[stages[kind]]
+            self.set_file_progress(index, STAGE_PROGRESS[kind])
+        elif kind == "cache_hit":
+            text = trans["progress_cached"]
+        elif kind == "language":
+            text = trans["progress_language"].format(language=event["language"],
+                                                     percent=int(event["probability"] * 100))
+        elif kind == "progress" and event["fraction"] is not None:
+            self.set_file_progress(index, event["fraction"])
+            eta = event["eta_seconds"]
+            text = trans["progress_segment"].format(
+                percent=int(event["fraction"] * 100),
+                eta=format_eta(eta) if eta is not None else "...",
+            )
+        elif kind in ("done", "failed"):
+            self.progress_bar["value"] = (index + 1) / self.batch_size * 100
+            text = ""
+        # Keep "paused" visible until the user resumes
+        if text is not None and not (self.job_control and self.job_control.paused):
+            self.progress_label.config(text=text)
 
 if __name__ == '__main__':
     root = tk.Tk()
@@ -0,0 +1,184 @@
+# model_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+
+from backends import DEFAULT_BACKEND, get_backend, load_model
+
+# Display names in the GUI (German and English) to Whisper model names
+MODEL_MAPPING = {
+    # German display names
+    "winzig": "tiny",
+    "mittel": "medium",
+    "mittelgroß (effizienter)": "turbo",
+    "groß": "large",
+    "groß (neuere Version)": "large-v3",
+
+    # English display names
+    "tiny": "tiny",
+    "medium": "medium",
+    "medium (efficient)": "turbo",
+    "large": "large",
+    "large (newer version)": "large-v3"
+}
+
+
+# torch is imported on first use so that importing this module stays cheap
+def _default_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _model_size_bytes(model):
+    import torch
+    if not isinstance(model, torch.nn.Module):
+        return 0
+    # The state dict also holds the packed weights of quantized layers
+    size = 0
+    pending = list(model.state_dict().values())
+    while pending:
+        value = pending.pop()
+        if isinstance(value, (tuple, list)):
+            pending.extend(value)
+        elif isinstance(value, torch.Tensor):
+            size += value.numel() * value.element_size()
+    return size
+
+
+class ModelCache:
+    """Process-wide registry of loaded models keyed by (name, device, dtype, backend).
+
+    Least recently used models are evicted once more than ``max_models`` are
+    resident or their combined size exceeds ``memory_budget_mb``. Models are
+    loaded outside the lock, so looking up one model never waits for another
+    to load; concurrent requests for a model being loaded share that load.
+    """
+
+    def __init__(self, max_models=1, memory_budget_mb=None, loader=load_model):
+        self.max_models = max_models
+        self.memory_budget_mb = memory_budget_mb
+        self.loader = loader
+        self._models = OrderedDict()
+        self._sizes = {}
+        self._loading = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def _key(self, model_name, device, dtype, backend):
+        backend = backend or DEFAULT_BACKEND
+        spec = get_backend(backend)
+        device = device or _default_device()
+        if device not in spec["devices"]:
+            device = spec["devices"][0]
+        return (model_name, device, dtype or spec["dtype"], backend)
+
+    def get(self, model_name, device=None, dtype=None, backend=None):
+        key = self._key(model_name, device, dtype, backend)
+        with self._lock:
+            if key in self._models:
+                self.hits += 1
+                self._models.move_to_end(key)
+                return self._models[key]
+            loading = self._loading.get(key)
+            if loading is None:
+                self.misses += 1
+                loading = self._loading[key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+        if not owner:
+            return loading.result()
+
+        start = time.perf_counter()
+        try:
+            model = self.loader(*key)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            loading.set_exception(e)
+            raise
+        elapsed = time.perf_counter() - start
+        logging.info("Loaded model %s on %s (%s, %s) in %.2fs", *key, elapsed)
+        size = _model_size_bytes(model)
+        with self._lock:
+            self.load_seconds += elapsed
+            self._models[key] = model
+            self._sizes[key] = size
+            del self._loading[key]
+            self._evict(keep=key)
+        loading.set_result(model)
+        return model
+
+    def _evict(self, keep):
+        while len(self._models) > 1:
+            over_count = self.max_models is not None and len(self._models) > self.max_models
+            over_budget = (
+                self.memory_budget_mb is not None
+                and self.resident_bytes() > self.memory_budget_mb * 1024 * 1024
+            )
+            if not (over_count or over_budget):
+                break
+            key = next(iter(self._models))
+            if key == keep:
+                break
+            del self._models[key]
+            del self._sizes[key]
+            self.evictions += 1
+            logging.info("Evicted model %s on %s (%s, %s) from cache", *key)
+
+    def resident_bytes(self):
+        return sum(self._sizes.values())
+
+    def contains(self, model_name, device=None, dtype=None, backend=None):
+        with self._lock:
+            return self._key(model_name, device, dtype, backend) in self._models
+
+    def wait_for_loads(self):
+        """Block until the models being loaded right now are in the cache (or failed to load)."""
+        with self._lock:
+            loading = list(self._loading.values())
+        wait(loading)
+
+    def discard(self, model_name, device=None, dtype=None, backend=None):
+        """Unload one model; returns whether it was resident."""
+        with self._lock:
+            key = self._key(model_name, device, dtype, backend)
+            self._sizes.pop(key, None)
+            return self._models.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._sizes.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 3),
+                "resident_models": [list(key) for key in self._models],
+                "resident_mb": round(self.resident_bytes() / (1024 * 1024), 1),
+            }
+
+
+_default_cache = ModelCache()
+
+
+def get_model(model_name, device=None, dtype=None, backend=None):
+    return _default_cache.get(model_name, device=device, dtype=dtype, backend=backend)
+
+
+def cache_stats():
+    return _default_cache.stats()
+
+
+def default_cache():
+    return _default_cache
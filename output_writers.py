@@ -0,0 +1,248 @@
+# output_writers.py
+import json
+import os
+import re
+import time
+
+from generate_srt import CueBuilder, format_srt_cue, format_vtt_cue
+
+PARTIAL_SUFFIX = ".part"
+_SRT_TIME = re.compile(r"(\d+):(\d\d):(\d\d),(\d\d\d)")
+_SRT_CUE = re.compile(
+    r"(\d+)\n(\d+:\d\d:\d\d,\d\d\d) --> (\d+:\d\d:\d\d,\d\d\d)\n(.*?)\n\n",
+    re.DOTALL,
+)
+
+
+def partial_path(path):
+    return path + PARTIAL_SUFFIX
+
+
+def parse_srt_timestamp(value):
+    hours, minutes, secs, millis = (int(part) for part in _SRT_TIME.match(value).groups())
+    return hours * 3600 + minutes * 60 + secs + millis / 1000
+
+
+class SegmentWriter:
+    """Base class for writers that append one segment at a time.
+
+    Every segment is flushed as soon as it is written, so a killed process
+    leaves a valid file containing all completed segments. With ``atomic``
+    that file is ``path + ".part"``, renamed to ``path`` only when the writer
+    is closed with ``commit``; a file at ``path`` is therefore always complete.
+    """
+
+    def __init__(self, path, append=False, atomic=False):
+        self.path = path
+        self.atomic = atomic
+        self.count = 0
+        self._file = open(partial_path(path) if atomic else path, "a" if append else "w", encoding="utf-8")
+
+    def write_segment(self, segment):
+        self._file.write(self.format_segment(segment))
+        self._file.flush()
+        self.count += 1
+
+    def format_segment(self, segment):
+        raise NotImplementedError
+
+    def close(self, commit=True):
+        if not self._file.closed:
+            self._file.close()
+            if self.atomic and commit:
+                os.replace(partial_path(self.path), self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+
+class TxtWriter(SegmentWriter):
+    """Plain-text writer; ``punctuation`` is an optional ``PunctuationStream``.
+
+    ``punctuation_seconds`` is the time spent converting punctuation commands.
+    """
+
+    def __init__(self, path, append=False, punctuation=None, atomic=False):
+        super().__init__(path, append=append, atomic=atomic)
+        self.punctuation = punctuation
+        self.punctuation_seconds = 0.0
+
+    def format_segment(self, segment):
+        if self.punctuation is not None:
+            return self._punctuate(self.punctuation.feed, segment["text"])
+        return segment["text"]
+
+    def _punctuate(self, func, *args):
+        start = time.perf_counter()
+        text = func(*args)
+        self.punctuation_seconds += time.perf_counter() - start
+        return text
+
+    def write_text(self, text):
+        self._file.write(text)
+        self._file.flush()
+
+    def close(self, commit=True):
+        if self.punctuation is not None and not self._file.closed:
+            self.write_text(self._punctuate(self.punctuation.flush))
+        super().close(commit)
+
+
+class SubtitleWriter(SegmentWriter):
+    """Base class for subtitle writers; segments are split into cues by a ``CueBuilder``.
+
+    ``cue_options`` are the builder's arguments. The builder holds back the
+    latest cue until the next one starts, so it is written on ``close``.
+    """
+
+    def __init__(self, path, append=False, atomic=False, cue_options=None):
+        super().__init__(path, append=append, atomic=atomic)
+        self.cues = CueBuilder(**(cue_options or {}))
+        self.cue_count = 0
+
+    def write_segment(self, segment):
+        self._write_cues(self.cues.add_segment(segment))
+        self.count += 1
+
+    def _write_cues(self, cues):
+        for cue in cues:
+            self._file.write(self.format_cue(cue))
+            self.cue_count += 1
+        self._file.flush()
+
+    def format_cue(self, cue):
+        raise NotImplementedError
+
+    def close(self, commit=True):
+        if not self._file.closed:
+            self._write_cues(self.cues.flush())
+        super().close(commit)
+
+
+class SrtWriter(SubtitleWriter):
+    def __init__(self, path, append=False, start_index=1, atomic=False, cue_options=None):
+        super().__init__(path, append=append, atomic=atomic, cue_options=cue_options)
+        self.start_index = start_index
+
+    def format_cue(self, cue):
+        return format_srt_cue(self.start_index + self.cue_count, cue)
+
+
+class VttWriter(SubtitleWriter):
+    def __init__(self, path, atomic=False, cue_options=None):
+        super().__init__(path, atomic=atomic, cue_options=cue_options)
+        self._file.write("WEBVTT\n\n")
+
+    def format_cue(self, cue):
+        return format_vtt_cue(cue)
+
+
+class JsonWriter(SegmentWriter):
+    """Streams segments, with their word timestamps if any, into ``{"segments": [...]}``.
+
+    Entries added to ``metadata`` before ``close`` are written after the
+    segments.
+    """
+
+    def __init__(self, path, atomic=False, metadata=None):
+        super().__init__(path, atomic=atomic)
+        self.metadata = dict(metadata or {})
+        self._file.write('{"segments": [')
+
+    def format_segment(self, segment):
+        entry = {
+            "id": self.count,
+            "start": round(segment["start"], 3),
+            "end": round(segment["end"], 3),
+            "text": segment["text"].strip(),
+        }
+        if segment.get("words"):
+            entry["words"] = [
+                {"word": word["word"], "start": round(word["start"], 3), "end": round(word["end"], 3)}
+                for word in segment["words"]
+            ]
+        return ("," if self.count else "") + "\n" + json.dumps(entry, ensure_ascii=False)
+
+    def close(self, commit=True):
+        if not self._file.closed:
+            tail = "".join(f", {json.dumps(k)}: {json.dumps(v, ensure_ascii=False)}" for k, v in self.metadata.items())
+            self._file.write(f"\n]{tail}}}\n")
+        super().close(commit)
+
+
+def _completed_cues(content):
+    cues = []
+    position = 0
+    for match in _SRT_CUE.finditer(content):
+        if match.start() != position:
+            break
+        index, start, end, text = match.groups()
+        cues.append({
+            "id": int(index) - 1,
+            "start": parse_srt_timestamp(start),
+            "end": parse_srt_timestamp(end),
+            "text": " " + " ".join(text.split("\n")),
+        })
+        position = match.end()
+    return cues, position
+
+
+def read_completed_cues(srt_path):
+    """Return the cues of ``srt_path`` that were written completely."""
+    if not os.path.exists(srt_path):
+        return []
+    with open(srt_path, "r", encoding="utf-8") as f:
+        return _completed_cues(f.read())[0]
+
+
+def prepare_resume(srt_path):
+    """Truncate a partial SRT file after its last completed cue.
+
+    Returns the completed cues; the caller continues transcribing from the
+    end of the last one and appends to the file.
+    """
+    if not os.path.exists(srt_path):
+        return []
+    with open(srt_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    cues, position = _completed_cues(content)
+    with open(srt_path, "w", encoding="utf-8") as f:
+        f.write(content[:position])
+    return cues
+
+
+def open_subtitle_writers(srt_path=None, vtt_path=None, json_path=None, cue_options=None,
+                          srt_append=False, srt_start_index=1, metadata=None):
+    """Open atomic writers for the subtitle and JSON outputs whose paths are given.
+
+    ``metadata`` is written into the JSON output.
+    """
+    writers = []
+    if srt_path:
+        writers.append(SrtWriter(srt_path, append=srt_append, start_index=srt_start_index, atomic=True,
+                                 cue_options=cue_options))
+    if vtt_path:
+        writers.append(VttWriter(vtt_path, atomic=True, cue_options=cue_options))
+    if json_path:
+        writers.append(JsonWriter(json_path, atomic=True, metadata=metadata))
+    return writers
+
+
+def write_transcript(txt_path, segments, srt_path=None, punctuation=None, vtt_path=None, json_path=None,
+                     cue_options=None, metadata=None):
+    """Atomically write already transcribed ``segments`` to a TXT file and the requested subtitle/JSON files."""
+    with TxtWriter(txt_path, punctuation=punctuation, atomic=True) as txt:
+        writers = open_subtitle_writers(srt_path, vtt_path, json_path, cue_options, metadata=metadata)
+        completed = False
+        try:
+            for segment in segments:
+                txt.write_segment(segment)
+                for writer in writers:
+                    writer.write_segment(segment)
+            completed = True
+        finally:
+            for writer in writers:
+                writer.close(commit=completed)
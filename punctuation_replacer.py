@@ -1,35 +1,308 @@
+import json
+import os
 import re
+import sys
 
-def transform_text_content(text: str) -> str:
-    # Protect "§ ... Absatz" patterns from replacements
-    protected_matches = re.findall(r"(?i)(§\s?\d+\sAbsatz\s?\d*)", text)
-    protected_map = {match: f"§PROTECTED{index}§" for index, match in enumerate(protected_matches)}
-
-    for original, placeholder in protected_map.items():
-        text = text.replace(original, placeholder)
-
-    replacements = {
-        r"(?i)\babsatz[.,]?\b": "\n",
-        r"(?i)doppelpunkt[.,]?": ":",
-        r"(?i)\bpunkt[.,]?": ".",
-        r"(?i)komma[.,]?": ",",
-        r"(?i)nächste ziffer\.": "\nNächste Ziffer"
-    }
-
-    for pattern, replacement in replacements.items():
-        text = re.sub(pattern, replacement, text)
-
-    for original, placeholder in protected_map.items():
-        text = text.replace(placeholder, original)
-
-    text = re.sub(r"\.\s*\.", ".", text)
-    text = re.sub(r",\s*,", ",", text)
-    text = re.sub(r"\.\s*:", ":", text)
-    text = re.sub(r"\.\s*,", ",", text)
-    text = re.sub(r",\s*doppel\s*\.", ":", text, flags=re.IGNORECASE)
-    text = re.sub(r"\bdoppel\s*\.", ":", text, flags=re.IGNORECASE)
-    text = re.sub(r"\?\s*fragezeichen\.", "?", text, flags=re.IGNORECASE)
-    text = re.sub(r"\?\?", "?", text)
-    text = re.sub(r"^\.\s*", "", text, flags=re.MULTILINE)
-
-    return text
+RULES_DIR = os.path.join(
+    getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "punctuation_rules"
+)
+DEFAULT_LANGUAGE = "de"
+
+_WORD_CHAR = re.compile(r"\w")
+_WORD_PAIR = re.compile(r"(?<!\w)([^\W\d_]+)(?=\s+([^\W\d_]+)(?!\w))")
+# Characters re.IGNORECASE matches to ASCII letters that str.lower() does not
+_CASE_FOLD_SPECIALS = re.compile("[\u0130\u0131\u017f\u212a]")
+_CASE_FOLD_ASCII = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+
+def _first_chars(pattern, replacement):
+    if isinstance(replacement, dict):
+        return {phrase[0] for phrase in replacement}
+    if pattern and (pattern[0].isalnum() or pattern[0] == "§"):
+        return {pattern[0].lower()}
+    return None
+
+
+def _normalize_phrase(text):
+    return " ".join(text.lower().split())
+
+
+def _trie_pattern(node):
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ""
+    group = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{group})?" if "" in node else group
+
+
+def phrase_pattern(phrases):
+    """Compile spoken phrases into one trie-shaped regex matching whole words.
+
+    The longest phrase wins, and one trailing "." or "," (often added by
+    Whisper after a command) is absorbed.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in _normalize_phrase(phrase):
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return rf"{_trie_pattern(trie)}(?!\w)[.,]?"
+
+
+class PunctuationEngine:
+    """Turns spoken punctuation commands into punctuation marks.
+
+    All commands and the optional protected pattern (text copied through
+    untouched, e.g. "§ 5 Absatz 2") are combined into one precompiled
+    alternation, so the text is scanned once. Commands are resolved
+    as if applied one after another in the order given: a word-boundary check
+    sees the output of earlier commands but the original text of later ones.
+    Patterns are written in lower case.
+    """
+
+    def __init__(self, commands, cleanup=(), protected=None, trigger_words=()):
+        """``commands`` are ``(pattern, replacement, word_start)`` tuples in the order they
+        are resolved. ``replacement`` may also be a dict from spoken phrase to
+        replacement, for patterns built by ``phrase_pattern``.
+        ``cleanup`` holds ``(pattern, replacement, gate)`` tuples run afterwards
+        in order, each skipped unless its lower-case ``gate`` text occurs.
+        ``trigger_words`` are words that can take part in a command.
+        """
+        # The combined pattern runs case-sensitively over the lower-cased text
+        # and has no capture groups, which lets re skip ahead on the possible
+        # first characters. The matching alternative is identified afterwards.
+        alternatives = [(protected, None)] if protected else []
+        alternatives += [
+            (pattern, (order, replacement, word_start))
+            for order, (pattern, replacement, word_start) in enumerate(commands)
+        ]
+        combined = "|".join(f"(?:{pattern})" for pattern, _ in alternatives)
+        self._scanner = re.compile(combined)
+        self._scanner_ignorecase = re.compile(combined, re.IGNORECASE)
+
+        # Alternatives that can match at a given (lower-case) first character
+        compiled = [
+            (re.compile(pattern, re.IGNORECASE), rule, _first_chars(pattern, rule[1] if rule else None))
+            for pattern, rule in alternatives
+        ]
+        self._all_candidates = [(alternative, rule) for alternative, rule, _ in compiled]
+        self._candidates = {}
+        for char in set().union(*(first for _, _, first in compiled if first)):
+            self._candidates[char] = [
+                (alternative, rule) for alternative, rule, first in compiled if first is None or char in first
+            ]
+
+        self._cleanup = [(re.compile(pattern), replacement, gate) for pattern, replacement, gate in cleanup]
+        self._inserted_text = "".join(
+            [r for _, r, _ in commands if isinstance(r, str)]
+            + [r for _, rs, _ in commands if isinstance(rs, dict) for r in rs.values()]
+            + [r for _, r, _ in cleanup]
+        ).lower()
+
+        triggers = {word.lower() for word in trigger_words}
+        for _, replacement, _ in commands:
+            if isinstance(replacement, dict):
+                triggers.update(word for phrase in replacement for word in phrase.split())
+        self._trigger_pattern = re.compile("|".join(map(re.escape, sorted(triggers)))) if triggers else None
+
+    def transform(self, text, protected=None):
+        """Apply all commands to ``text``.
+
+        ``protected`` collects the citations seen so far and is shared between
+        the chunks of a stream.
+        """
+        if protected is None:
+            protected = {}
+        lowered = text.lower()
+        if len(lowered) == len(text) and not _CASE_FOLD_SPECIALS.search(text):
+            scanned = gated = lowered
+            matches = self._scanner.finditer(lowered)
+        else:
+            scanned = text
+            # Cleanup gates must see every letter the case-insensitive patterns match
+            gated = text.translate(_CASE_FOLD_ASCII).lower()
+            matches = self._scanner_ignorecase.finditer(text)
+
+        pieces = []
+        position = 0
+        last_end = -1
+        last_order = -1
+        last_char = ""
+        for match in matches:
+            start, end = match.span()
+            candidates = self._candidates.get(scanned[start], self._all_candidates)
+            for alternative, rule in candidates:
+                if alternative.match(text, start):
+                    break
+
+            if rule is None:
+                # A protected match that extends an earlier one (e.g. "§ 5 Absatz 2"
+                # after "§ 5 Absatz") only has that earlier prefix protected;
+                # the trailing digits count as ordinary text.
+                original = text[start:end]
+                index = protected.setdefault(original, len(protected))
+                if index and any(
+                    protected.get(original[:cut], index) < index for cut in range(len(original) - 1, 0, -1)
+                ):
+                    continue
+                last_end, last_order, last_char = end, -1, "§"
+                continue
+
+            order, replacement, word_start = rule
+            if isinstance(replacement, dict):
+                replacement = replacement[_normalize_phrase(scanned[start:end].rstrip(".,"))]
+            if word_start and start > 0:
+                if start == last_end and last_order < order:
+                    previous = last_char
+                else:
+                    previous = text[start - 1]
+                if previous and _WORD_CHAR.match(previous):
+                    continue
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = end
+            last_end, last_order, last_char = end, order, replacement[-1:]
+
+        pieces.append(text[position:])
+        text = "".join(pieces)
+        for pattern, replacement, gate in self._cleanup:
+            if gate in gated or gate in self._inserted_text:
+                text = pattern.sub(replacement, text)
+        return text
+
+    def _safe_cut(self, text):
+        """Return the last position where ``text`` can be split without changing the result.
+
+        That is the gap between two plain words, neither of which is part of
+        a command.
+        """
+        cut = 0
+        for match in _WORD_PAIR.finditer(text):
+            if self._trigger_pattern is None or not (
+                self._trigger_pattern.search(match.group(1).lower())
+                or self._trigger_pattern.search(match.group(2).lower())
+            ):
+                cut = match.end()
+        return cut
+
+    def stream(self):
+        return PunctuationStream(self)
+
+    def transform_stream(self, texts):
+        """Transform an iterable of text pieces, e.g. segment texts as they are transcribed.
+
+        Yields output chunks whose concatenation equals ``transform`` of the
+        concatenated input.
+        """
+        stream = self.stream()
+        for text in texts:
+            chunk = stream.feed(text)
+            if chunk:
+                yield chunk
+        chunk = stream.flush()
+        if chunk:
+            yield chunk
+
+
+class PunctuationStream:
+    """Incremental form of ``PunctuationEngine.transform``.
+
+    Only the text after the last safe split point is held back between
+    ``feed`` calls; ``flush`` returns the rest.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._pending = ""
+        self._protected = {}
+
+    def feed(self, text):
+        self._pending += text
+        cut = self._engine._safe_cut(self._pending)
+        if not cut:
+            return ""
+        chunk, self._pending = self._pending[:cut], self._pending[cut:]
+        return self._engine.transform(chunk, self._protected)
+
+    def flush(self):
+        chunk, self._pending = self._pending, ""
+        return self._engine.transform(chunk, self._protected) if chunk else ""
+
+
+def load_rule_pack(path):
+    """Build a ``PunctuationEngine`` from a JSON rule pack.
+
+    A pack has ``commands`` (each either a regex ``pattern`` or a list of
+    spoken ``words``, plus a ``replacement``), optional ``cleanup`` patterns,
+    an optional ``protected`` pattern copied through untouched and optional
+    ``trigger_words`` for regex commands.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        pack = json.load(f)
+
+    commands = []
+    phrases = {}
+    for command in pack["commands"] + [None]:
+        if command is not None and "words" in command:
+            for word in command["words"]:
+                phrases.setdefault(_normalize_phrase(word), command["replacement"])
+            continue
+        # Consecutive word commands share one trie-shaped alternative
+        if phrases:
+            commands.append((phrase_pattern(phrases), phrases, True))
+            phrases = {}
+        if command is not None:
+            commands.append((command["pattern"], command["replacement"], command.get("word_start", False)))
+
+    cleanup = [(rule["pattern"], rule["replacement"], rule.get("gate", "")) for rule in pack.get("cleanup", [])]
+    return PunctuationEngine(
+        commands, cleanup, protected=pack.get("protected"), trigger_words=pack.get("trigger_words", ())
+    )
+
+
+_engines = {}
+_pack_paths = None
+
+
+def _find_pack(language):
+    global _pack_paths
+    if _pack_paths is None:
+        _pack_paths = {}
+        for name in sorted(os.listdir(RULES_DIR)) if os.path.isdir(RULES_DIR) else []:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(RULES_DIR, name)
+            with open(path, "r", encoding="utf-8") as f:
+                pack = json.load(f)
+            for key in [pack.get("language", name[:-5])] + pack.get("aliases", []):
+                _pack_paths.setdefault(key.lower(), path)
+    return _pack_paths.get((language or "").strip().lower())
+
+
+def engine_for_language(language=DEFAULT_LANGUAGE):
+    """Return the compiled engine for ``language`` (code or name), or None without a rule pack."""
+    path = _find_pack(language)
+    if path is None:
+        return None
+    if path not in _engines:
+        _engines[path] = load_rule_pack(path)
+    return _engines[path]
+
+
+def transform_text_content(text: str, language: str = DEFAULT_LANGUAGE) -> str:
+    engine = engine_for_language(language)
+    return engine.transform(text) if engine else text
+
+
+def transform_text_stream(texts, language=DEFAULT_LANGUAGE):
+    engine = engine_for_language(language)
+    return engine.transform_stream(texts) if engine else iter(texts)
+
+
+def punctuation_stream(language=DEFAULT_LANGUAGE):
+    engine = engine_for_language(language)
+    return engine.stream() if engine else None
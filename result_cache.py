@@ -0,0 +1,154 @@
+# result_cache.py
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper_desktop_app", "results")
+DEFAULT_MAX_SIZE_MB = 512
+
+
+def file_digest(filepath, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compact_segment(segment):
+    compact = {"start": round(segment["start"], 3), "end": round(segment["end"], 3), "text": segment["text"]}
+    if segment.get("words"):
+        compact["words"] = [
+            {"word": w["word"], "start": round(w["start"], 3), "end": round(w["end"], 3)} for w in segment["words"]
+        ]
+    return compact
+
+
+def compact_result(text, segments, language=None):
+    result = {"text": text, "segments": [_compact_segment(segment) for segment in segments]}
+    # Detected language of a language="auto" run
+    if language is not None:
+        result["language"] = language
+    return result
+
+
+class ResultCache:
+    """On-disk cache of raw Whisper results keyed by audio content and model settings.
+
+    Entries are gzipped JSON files. Reading an entry refreshes its mtime, and
+    the least recently used entries are removed once the directory grows past
+    ``max_size_mb``.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, filepath, **settings):
+        parts = [file_digest(filepath)]
+        parts += [f"{name}={settings[name]}" for name in sorted(settings)]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key, text, segments, language=None):
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            json.dump(compact_result(text, segments, language), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, path)
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json.gz"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        limit = self.max_size_mb * 1024 * 1024
+        for _, size, name in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+                logging.info("Evicted cached result %s", name)
+            except OSError:
+                pass
+
+    def clear(self):
+        for _, _, name in self._entries():
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "cache_dir": self.cache_dir,
+            "entries": len(entries),
+            "size_mb": round(sum(size for _, size, _ in entries) / (1024 * 1024), 2),
+            "max_size_mb": self.max_size_mb,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_default_cache = None
+
+
+def default_result_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache(os.environ.get("TRANSCRIBER_CACHE_DIR", DEFAULT_CACHE_DIR))
+    return _default_cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the transcription result cache.")
+    parser.add_argument("--cache-dir", default=os.environ.get("TRANSCRIBER_CACHE_DIR", DEFAULT_CACHE_DIR))
+    parser.add_argument("--clear", action="store_true", help="Remove all cached results")
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+    for name, value in cache.stats().items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# scheduler.py
+import logging
+import os
+import re
+import subprocess
+import sys
+
+from backends import DEFAULT_BACKEND
+
+# Approximate peak memory of one transcription worker in MB (PyTorch, float32,
+# including the audio and decoder state), after the figures in Whisper's README
+MODEL_MEMORY_MB = {
+    "tiny": 1000,
+    "base": 1000,
+    "small": 2000,
+    "medium": 5000,
+    "turbo": 6000,
+    "large": 10000,
+    "large-v1": 10000,
+    "large-v2": 10000,
+    "large-v3": 10000,
+    "large-v3-turbo": 6000,
+}
+# Share of that footprint each engine needs at its peak. whisper-int8 loads
+# the float32 model before quantizing it, so it peaks like whisper.
+BACKEND_MEMORY_FACTOR = {"whisper": 1.0, "whisper-int8": 1.0, "faster-whisper": 0.4}
+# Largest to smallest; a model that does not fit is replaced by the next one that does
+DOWNGRADE_ORDER = ["large-v3", "large-v2", "large", "large-v1", "large-v3-turbo", "turbo", "medium", "small",
+                   "base", "tiny"]
+# Free memory left to the OS and other programs
+RESERVED_MB = 1024
+DEFAULT_MAX_THREADS = 4
+
+
+class InsufficientMemory(Exception):
+    def __init__(self, message, need_mb, budget_mb):
+        super().__init__(message)
+        self.need_mb = need_mb
+        self.budget_mb = budget_mb
+
+
+def model_memory_mb(model_name, backend=DEFAULT_BACKEND):
+    """Approximate footprint of one worker running ``model_name``; English-only models count as multilingual."""
+    base = MODEL_MEMORY_MB.get(model_name.replace(".en", ""), MODEL_MEMORY_MB["large"])
+    return int(base * BACKEND_MEMORY_FACTOR.get(backend, 1.0))
+
+
+def available_memory_mb():
+    """Memory that can be used without swapping, in MB, or None if it cannot be determined."""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/meminfo", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) / 1024
+        elif sys.platform == "darwin":
+            output = subprocess.run(["vm_stat"], capture_output=True, text=True, check=True).stdout
+            page_size = int(re.search(r"page size of (\d+) bytes", output).group(1))
+            pages = sum(
+                int(re.search(rf"{name}:\s+(\d+)", output).group(1))
+                for name in ("Pages free", "Pages inactive", "Pages speculative")
+            )
+            return pages * page_size / (1024 * 1024)
+        elif sys.platform == "win32":
+            return _windows_available_memory_mb()
+    except (OSError, ValueError, AttributeError, subprocess.CalledProcessError) as e:
+        logging.warning("Could not determine free memory: %s", e)
+    return None
+
+
+def _windows_available_memory_mb():
+    import ctypes
+
+    class MemoryStatus(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", ctypes.c_ulong),
+            ("dwMemoryLoad", ctypes.c_ulong),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+
+    status = MemoryStatus()
+    status.dwLength = ctypes.sizeof(MemoryStatus)
+    if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+        raise OSError("GlobalMemoryStatusEx failed")
+    return status.ullAvailPhys / (1024 * 1024)
+
+
+def memory_budget_mb(reclaimable_mb=0.0):
+    """Memory transcription may use: what is free now, plus ``reclaimable_mb`` (models this process
+    would unload), minus a reserve for the rest of the system. None if free memory is unknown."""
+    available = available_memory_mb()
+    if available is None:
+        return None
+    return max(available + reclaimable_mb - RESERVED_MB, 0.0)
+
+
+def fitting_model(model_name, backend, budget_mb):
+    """The largest model no bigger than ``model_name`` that fits ``budget_mb``, or None."""
+    name = model_name.replace(".en", "")
+    candidates = DOWNGRADE_ORDER[DOWNGRADE_ORDER.index(name):] if name in DOWNGRADE_ORDER else [model_name]
+    for candidate in candidates:
+        if model_memory_mb(candidate, backend) <= budget_mb:
+            return candidate
+    return None
+
+
+class ResourcePlan:
+    def __init__(self, model_name, backend, workers, threads, budget_mb, requested_model, warnings):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = workers
+        self.threads = threads
+        self.budget_mb = budget_mb
+        self.requested_model = requested_model
+        self.warnings = warnings
+
+    @property
+    def downgraded(self):
+        return self.model_name != self.requested_model
+
+    def __repr__(self):
+        return (f"ResourcePlan({self.model_name!r}, {self.backend!r}, workers={self.workers}, "
+                f"threads={self.threads}, budget_mb={self.budget_mb})")
+
+
+def plan_resources(model_name, backend=None, jobs=1, workers=None, threads=None, budget_mb=None,
+                   allow_downgrade=True, reclaimable_mb=0.0, resident=False):
+    """Choose the model, worker processes and torch threads per worker for this host.
+
+    Workers are limited by the CPU count and by how many copies of the model
+    fit into ``budget_mb`` (default: free memory, see ``memory_budget_mb``).
+    ``resident`` means the model is already loaded in this process, so the
+    first worker needs no extra memory. A model that does not fit even once is
+    replaced by the largest smaller one that does, or, without
+    ``allow_downgrade``, refused with ``InsufficientMemory``. Every adjustment
+    is explained in ``warnings``.
+    """
+    backend = backend or DEFAULT_BACKEND
+    cpus = os.cpu_count() or 1
+    warnings = []
+    if budget_mb is None:
+        budget_mb = memory_budget_mb(reclaimable_mb)
+        if budget_mb is None:
+            warnings.append("Free memory could not be determined; the model and worker count are not checked")
+
+    requested_model = model_name
+    if budget_mb is not None and not resident:
+        need = model_memory_mb(model_name, backend)
+        if need > budget_mb:
+            smaller = fitting_model(model_name, backend, budget_mb) if allow_downgrade else None
+            message = (f"Model {model_name} ({backend}) needs about {need / 1024:.1f} GB, "
+                       f"but only {budget_mb / 1024:.1f} GB are available")
+            if smaller is None:
+                raise InsufficientMemory(message, need, budget_mb)
+            warnings.append(f"{message}; using {smaller} instead")
+            model_name = smaller
+
+    if workers is None:
+        workers = max(1, cpus // (threads or min(DEFAULT_MAX_THREADS, cpus)))
+    if budget_mb is not None:
+        per_worker = model_memory_mb(model_name, backend)
+        memory_workers = max(1, int((budget_mb + (per_worker if resident else 0)) // per_worker))
+        if memory_workers < workers:
+            warnings.append(f"Memory allows {memory_workers} worker(s) with {model_name} instead of {workers}")
+            workers = memory_workers
+    workers = max(1, min(workers, jobs))
+    # Cores not taken by extra workers go to each worker's torch threads
+    if threads is None:
+        threads = max(1, cpus // workers)
+    return ResourcePlan(model_name, backend, workers, threads, budget_mb, requested_model, warnings)
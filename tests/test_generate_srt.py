@@ -0,0 +1,85 @@
+import pytest
+
+from generate_srt import CueBuilder, build_cues, format_timestamp, generate_srt
+from output_writers import SrtWriter, prepare_resume, read_completed_cues
+
+
+@pytest.mark.parametrize("seconds, expected", [
+    (1.9999, "00:00:02,000"),
+    (59.9996, "00:01:00,000"),
+    (3599.9995, "01:00:00,000"),
+    (1.0004, "00:00:01,000"),
+    (-0.2, "00:00:00,000"),
+])
+def test_timestamps_round_to_whole_milliseconds(seconds, expected):
+    assert format_timestamp(seconds) == expected
+
+
+def test_vtt_timestamps_use_a_dot():
+    assert format_timestamp(61.5, ".") == "00:01:01.500"
+
+
+def test_cues_respect_line_length_and_line_count():
+    words = [f"word{i:02}" for i in range(40)] + ["extraordinarily-long-compound-word", "end"]
+    segment = {"start": 0.0, "end": 40.0, "text": " " + " ".join(words)}
+    cues = list(build_cues([segment], max_line_chars=20, max_lines=2, max_duration=60.0))
+
+    assert len(cues) > 1
+    for cue in cues:
+        lines = cue["text"].split("\n")
+        assert len(lines) <= 2
+        assert all(len(line) <= 20 or " " not in line for line in lines)
+    # No word is lost or reordered, and the long word has a line of its own
+    assert " ".join(cue["text"].replace("\n", " ") for cue in cues).split() == words
+    assert any("extraordinarily-long-compound-word" in cue["text"].split("\n") for cue in cues)
+
+
+def test_cues_are_cut_at_max_duration():
+    segment = {"start": 0.0, "end": 20.0, "text": " " + " ".join(["ab"] * 20)}
+    cues = list(build_cues([segment], max_line_chars=200, max_lines=1, max_duration=7.0))
+    assert len(cues) == 3
+    assert all(cue["end"] - cue["start"] <= 7.0 for cue in cues)
+    assert cues[-1]["end"] == 20.0
+
+
+def test_short_cues_are_stretched_up_to_the_next_one():
+    segments = [
+        {"start": 0.0, "end": 0.2, "text": " Hi."},
+        {"start": 0.5, "end": 0.7, "text": " Ok."},
+        {"start": 3.0, "end": 3.2, "text": " Yes."},
+    ]
+    cues = list(build_cues(segments, min_duration=1.0))
+    assert [(cue["start"], cue["end"]) for cue in cues] == [(0.0, 0.5), (0.5, 1.5), (3.0, 4.0)]
+
+
+def test_sentences_end_a_cue_once_it_is_long_enough():
+    segment = {"start": 0.0, "end": 4.0, "text": " One. Two three. Four."}
+    builder = CueBuilder(min_duration=1.0)
+    cues = builder.add_segment(segment) + builder.flush()
+    assert [cue["text"] for cue in cues] == ["One. Two three.", "Four."]
+
+
+def test_resume_keeps_completed_cues_and_continues_numbering(tmp_path):
+    path = tmp_path / "a.srt.part"
+    complete = generate_srt([
+        {"start": 0.0, "end": 2.0, "text": " First."},
+        {"start": 2.0, "end": 4.5, "text": " Second\nline."},
+    ])
+    path.write_text(complete + "3\n00:00:04,500 --> 00:00:0", encoding="utf-8")
+
+    done = prepare_resume(str(path))
+    assert [(cue["start"], cue["end"], cue["text"]) for cue in done] == [
+        (0.0, 2.0, " First."), (2.0, 4.5, " Second line."),
+    ]
+    assert path.read_text(encoding="utf-8") == complete
+
+    writer = SrtWriter(str(tmp_path / "a.srt"), append=True, start_index=len(done) + 1, atomic=True)
+    writer.write_segment({"start": 4.5, "end": 6.0, "text": " Third."})
+    writer.close()
+    cues = read_completed_cues(str(tmp_path / "a.srt"))
+    assert [cue["id"] for cue in cues] == [0, 1, 2]
+    assert cues[-1]["text"] == " Third."
+
+
+def test_resume_without_partial_file(tmp_path):
+    assert prepare_resume(str(tmp_path / "missing.srt.part")) == []
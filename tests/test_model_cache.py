@@ -0,0 +1,73 @@
+import threading
+
+from model_cache import ModelCache
+
+
+def test_loading_one_model_does_not_block_another():
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def loader(model_name, device, dtype, backend):
+        loads.append(model_name)
+        if model_name == "large-v3":
+            started.set()
+            assert release.wait(5)
+        return object()
+
+    cache = ModelCache(max_models=2, loader=loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("large-v3", device="cpu")))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+
+    cache.get("tiny", device="cpu")
+    assert cache.contains("tiny", device="cpu")
+    assert not cache.contains("large-v3", device="cpu")
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len({id(model) for model in results}) == 1
+    assert loads.count("large-v3") == 1
+
+
+def test_failed_load_is_retried():
+    attempts = []
+
+    def loader(*key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise OSError("download failed")
+        return object()
+
+    cache = ModelCache(loader=loader)
+    try:
+        cache.get("tiny", device="cpu")
+    except OSError:
+        pass
+    assert cache.get("tiny", device="cpu") is not None
+    assert len(attempts) == 2
+
+
+def test_wait_for_loads_lets_clear_unload_a_loading_model():
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader(*key):
+        started.set()
+        assert release.wait(5)
+        return object()
+
+    cache = ModelCache(loader=loader)
+    thread = threading.Thread(target=cache.get, args=("tiny",), kwargs={"device": "cpu"})
+    thread.start()
+    assert started.wait(5)
+    threading.Timer(0.1, release.set).start()
+
+    cache.wait_for_loads()
+    assert cache.contains("tiny", device="cpu")
+    cache.clear()
+    thread.join()
+    assert cache.stats()["resident_models"] == []
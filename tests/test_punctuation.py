@@ -0,0 +1,74 @@
+import random
+import re
+
+import pytest
+
+from punctuation_replacer import engine_for_language, transform_text_content
+
+
+def baseline_transform(text):
+    """The German implementation the rule packs replaced, kept as the reference."""
+    protected_matches = re.findall(r"(?i)(§\s?\d+\sAbsatz\s?\d*)", text)
+    protected_map = {match: f"§PROTECTED{index}§" for index, match in enumerate(protected_matches)}
+
+    for original, placeholder in protected_map.items():
+        text = text.replace(original, placeholder)
+
+    replacements = {
+        r"(?i)\babsatz[.,]?\b": "\n",
+        r"(?i)doppelpunkt[.,]?": ":",
+        r"(?i)\bpunkt[.,]?": ".",
+        r"(?i)komma[.,]?": ",",
+        r"(?i)nächste ziffer\.": "\nNächste Ziffer"
+    }
+
+    for pattern, replacement in replacements.items():
+        text = re.sub(pattern, replacement, text)
+
+    for original, placeholder in protected_map.items():
+        text = text.replace(placeholder, original)
+
+    text = re.sub(r"\.\s*\.", ".", text)
+    text = re.sub(r",\s*,", ",", text)
+    text = re.sub(r"\.\s*:", ":", text)
+    text = re.sub(r"\.\s*,", ",", text)
+    text = re.sub(r",\s*doppel\s*\.", ":", text, flags=re.IGNORECASE)
+    text = re.sub(r"\bdoppel\s*\.", ":", text, flags=re.IGNORECASE)
+    text = re.sub(r"\?\s*fragezeichen\.", "?", text, flags=re.IGNORECASE)
+    text = re.sub(r"\?\?", "?", text)
+    text = re.sub(r"^\.\s*", "", text, flags=re.MULTILINE)
+
+    return text
+
+
+WORDS = [
+    "Punkt", "punkt.", "PUNKT,", "Komma", "komma,", "Doppelpunkt", "doppelpunkt.", "Doppel.", "doppel", "DOPPEL .",
+    "Absatz", "absatz.", "Absatz,", "§", "§ 5", "§5", "Absatz 2", "5", "Fragezeichen.", "fragezeichen", "?", "??",
+    ".", ",", ":", "Nächste Ziffer.", "nächste", "Ziffer.", "Hallo", "Welt", "Apunkt", "Kommando", "Doppelpunkte",
+    "İ", "ı", "ſ", "K", "İst", "Kſ", "\n",
+]
+SEPARATORS = [" ", " ", " ", "", "  ", "\n"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("İ Doppel.", "İ :"),
+    ("ı ? Fragezeichen.", "ı ?"),
+    ("Hallo Welt Punkt Neuer Satz Doppelpunkt", "Hallo Welt . Neuer Satz :"),
+    ("siehe § 5 Absatz 2 Absatz weiter", "siehe § 5 Absatz 2 \\n weiter".replace("\\n", "\n")),
+])
+def test_known_cases(text, expected):
+    assert baseline_transform(text) == expected
+    assert transform_text_content(text, "de") == expected
+
+
+def test_matches_baseline_on_random_dictation():
+    rng = random.Random(8)
+    engine = engine_for_language("de")
+    for _ in range(3000):
+        count = rng.randint(1, 12)
+        text = "".join(rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(count))
+        expected = baseline_transform(text)
+        assert engine.transform(text) == expected, repr(text)
+        cuts = [0, *sorted(rng.randint(0, len(text)) for _ in range(3)), len(text)]
+        pieces = [text[start:end] for start, end in zip(cuts, cuts[1:])]
+        assert "".join(engine.transform_stream(pieces)) == expected, repr(pieces)
@@ -0,0 +1,59 @@
+import pytest
+
+import scheduler
+from scheduler import InsufficientMemory, fitting_model, model_memory_mb, plan_resources
+
+
+@pytest.fixture(autouse=True)
+def eight_cpus(monkeypatch):
+    monkeypatch.setattr(scheduler.os, "cpu_count", lambda: 8)
+
+
+def test_int8_is_budgeted_at_its_load_peak():
+    assert model_memory_mb("large", "whisper-int8") >= model_memory_mb("large", "whisper")
+    assert fitting_model("large", "whisper-int8", 6000) == "large-v3-turbo"
+
+
+def test_model_that_does_not_fit_is_downgraded():
+    plan = plan_resources("large-v3", "whisper", jobs=4, budget_mb=5500)
+
+    assert plan.model_name == "medium" and plan.requested_model == "large-v3"
+    assert plan.downgraded
+    assert plan.workers == 1 and plan.threads == 8
+    assert any("using medium instead" in warning for warning in plan.warnings)
+
+
+def test_model_that_does_not_fit_is_refused_without_downgrade():
+    with pytest.raises(InsufficientMemory) as excinfo:
+        plan_resources("large-v3", "whisper-int8", budget_mb=5500, allow_downgrade=False)
+    assert excinfo.value.need_mb == 10000 and excinfo.value.budget_mb == 5500
+
+
+def test_nothing_fits():
+    with pytest.raises(InsufficientMemory):
+        plan_resources("small", "whisper", budget_mb=500)
+
+
+@pytest.mark.parametrize("budget_mb, jobs, workers, threads", [
+    (10000, 10, 2, 4),  # CPU-bound: 8 cores at 4 threads per worker
+    (2500, 10, 2, 4),
+    (1500, 10, 1, 8),  # memory-bound: one copy of the model fits
+    (10000, 1, 1, 8),  # never more workers than jobs
+])
+def test_workers_and_threads(budget_mb, jobs, workers, threads):
+    plan = plan_resources("tiny", "whisper", jobs=jobs, budget_mb=budget_mb)
+
+    assert (plan.model_name, plan.workers, plan.threads) == ("tiny", workers, threads)
+    assert bool(plan.warnings) == (budget_mb == 1500)
+
+
+def test_explicit_workers_are_capped_by_memory():
+    plan = plan_resources("small", "whisper", jobs=10, workers=6, threads=1, budget_mb=4500)
+
+    assert (plan.workers, plan.threads) == (2, 1)
+
+
+def test_resident_model_needs_no_extra_memory():
+    plan = plan_resources("medium", "whisper", jobs=2, budget_mb=1000, resident=True, allow_downgrade=False)
+
+    assert plan.model_name == "medium" and plan.workers == 1
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+import numpy as np
+import pytest
+
+import transcriber
+import transcription_service
+from model_cache import default_cache
+from transcription_service import ServiceClient, TranscriptionService, make_server
+
+
+class FakeModel:
+    def __init__(self, name, gate):
+        self.name = name
+        self.gate = gate
+
+    def transcribe(self, audio, language=None, initial_prompt=None, **options):
+        assert self.gate.wait(5)
+        return {"text": f" {self.name} text", "segments": [{"start": 0.0, "end": 2.0, "text": f" {self.name} text"}]}
+
+
+@pytest.fixture
+def gate():
+    gate = threading.Event()
+    yield gate
+    gate.set()
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch, gate):
+    cache = default_cache()
+    monkeypatch.setattr(cache, "loader", lambda model_name, *key: FakeModel(model_name, gate))
+    monkeypatch.setattr(cache, "max_models", cache.max_models)
+    monkeypatch.setattr(transcription_service, "plan_resources", lambda *args, **kwargs: None)
+    monkeypatch.setattr(transcriber, "probe_duration", lambda filepath: 2.0)
+    monkeypatch.setattr(transcriber, "load_audio", lambda filepath: np.zeros(2 * 16000, dtype=np.float32))
+    cache.clear()
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"fake audio")
+    yield str(path)
+    cache.clear()
+
+
+def start(tmp_path, **options):
+    service = TranscriptionService(str(tmp_path / "out"), use_cache=False, **options)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ServiceClient(f"http://127.0.0.1:{server.server_address[1]}", timeout=5)
+    return service, server, client
+
+
+@pytest.fixture
+def stop():
+    servers = []
+    yield servers.append
+    for service, server in servers:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+
+
+def wait_for_state(client, job_id, state):
+    for _ in range(100):
+        if client.status(job_id)["state"] == state:
+            return
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} never became {state}")
+
+
+def test_submit_wait_result(tmp_path, recording, gate, stop):
+    service, server, client = start(tmp_path)
+    stop((service, server))
+    gate.set()
+
+    job = client.submit(recording, model_name="tiny")
+    assert client.wait(job["id"], poll_seconds=0.05, timeout=5)["state"] == "done"
+    result = client.result(job["id"])
+    assert result["txt"].strip() == "tiny text"
+    assert client.metrics()["jobs"]["done"] == 1
+
+
+def test_cancel_queued_job(tmp_path, recording, gate, stop):
+    service, server, client = start(tmp_path)
+    stop((service, server))
+
+    running = client.submit(recording, model_name="tiny")
+    wait_for_state(client, running["id"], "running")
+    queued = client.submit(recording, model_name="tiny")
+    assert client.cancel(queued["id"])["state"] == "cancelled"
+
+    gate.set()
+    assert client.wait(running["id"], poll_seconds=0.05, timeout=5)["state"] == "done"
+    assert client.status(queued["id"])["state"] == "cancelled"
+    assert client.metrics()["queued"] == 0
+
+
+def test_full_queue_is_refused_with_retry_after(tmp_path, recording, gate, stop):
+    service, server, client = start(tmp_path, max_queued=1)
+    stop((service, server))
+
+    running = client.submit(recording, model_name="tiny")
+    wait_for_state(client, running["id"], "running")
+    client.submit(recording, model_name="tiny")
+
+    body = json.dumps({"path": recording, "model_name": "tiny"}).encode("utf-8")
+    with pytest.raises(urlerror.HTTPError) as refused:
+        urlrequest.urlopen(urlrequest.Request(client.url + "/jobs", data=body, method="POST"), timeout=5)
+    assert refused.value.code == 429
+    assert int(refused.value.headers["Retry-After"]) >= 1
+    assert json.load(refused.value)["retry_after"] >= 1
+    assert client.metrics()["jobs"]["rejected"] == 1
+
+
+def test_idle_route_is_retired_at_max_models(tmp_path, recording, gate, stop):
+    service, server, client = start(tmp_path, max_models=1)
+    stop((service, server))
+
+    first = client.submit(recording, model_name="tiny")
+    wait_for_state(client, first["id"], "running")
+    # The only model slot is busy
+    with pytest.raises(transcription_service.ServiceError) as refused:
+        client.submit(recording, model_name="base")
+    assert refused.value.status == 429
+
+    gate.set()
+    client.wait(first["id"], poll_seconds=0.05, timeout=5)
+    second = client.submit(recording, model_name="base")
+    assert client.wait(second["id"], poll_seconds=0.05, timeout=5)["state"] == "done"
+    assert list(client.metrics()["routes"]) == ["base/whisper"]
+    assert not default_cache().contains("tiny", backend="whisper")
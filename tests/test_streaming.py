@@ -0,0 +1,84 @@
+import io
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+import audio_io
+import transcriber
+from audio_io import SAMPLE_RATE, AudioStream
+
+WORD_SECONDS = 0.5
+WORDS_PER_SEGMENT = 4
+WORD_SAMPLES = int(WORD_SECONDS * SAMPLE_RATE)
+
+
+def make_pcm(words):
+    # Word n is a constant run of amplitude 10 * n, so the fake model can read it back
+    return np.repeat(np.arange(1, words + 1, dtype=np.int16) * 10, WORD_SAMPLES).tobytes()
+
+
+class FakeModel:
+    """Recognises the words of ``make_pcm``; like Whisper, a segment cut by the window end loses its last word."""
+
+    def transcribe(self, samples, language=None, initial_prompt=None, **options):
+        codes = np.round(samples * 32768 / 10).astype(int)
+        bounds = [0, *(np.flatnonzero(np.diff(codes)) + 1), len(codes)]
+        segments = {}
+        for first, last in zip(bounds, bounds[1:]):
+            if last - first < WORD_SAMPLES:
+                continue
+            number = int(codes[first])
+            segment = segments.setdefault((number - 1) // WORDS_PER_SEGMENT, {"start": first / SAMPLE_RATE,
+                                                                              "words": []})
+            segment["words"].append(f"w{number}")
+            segment["end"] = last / SAMPLE_RATE
+        result = []
+        for segment in segments.values():
+            if segment["end"] == len(codes) / SAMPLE_RATE and len(segment["words"]) < WORDS_PER_SEGMENT:
+                segment["words"] = segment["words"][:-1] or segment["words"]
+            result.append({"start": segment["start"], "end": segment["end"],
+                           "text": " " + " ".join(segment["words"])})
+        return {"text": "".join(segment["text"] for segment in result), "segments": result}
+
+
+@pytest.fixture
+def fake_audio(monkeypatch):
+    pcm = make_pcm(600)
+
+    @contextmanager
+    def open_audio_stream(filepath, start_seconds=0.0):
+        yield AudioStream(io.BytesIO(pcm[int(start_seconds * SAMPLE_RATE) * 2:]), start_seconds)
+
+    monkeypatch.setattr(transcriber, "open_audio_stream", open_audio_stream)
+    monkeypatch.setattr(audio_io, "open_audio_stream", open_audio_stream)
+    return pcm
+
+
+@pytest.mark.parametrize("window_seconds", [30.0, 29.3, 7.75])
+def test_streaming_keeps_every_word_once(fake_audio, window_seconds):
+    segments = list(transcriber.iter_streaming_segments(FakeModel(), "fake.wav", window_seconds=window_seconds))
+
+    words = " ".join(segment["text"] for segment in segments).split()
+    assert words == [f"w{number}" for number in range(1, 601)]
+    assert [segment["id"] for segment in segments] == list(range(len(segments)))
+    for previous, segment in zip(segments, segments[1:]):
+        assert previous["end"] <= segment["start"] <= segment["end"]
+
+
+def test_streaming_resumes_from_start_seconds(fake_audio):
+    segments = list(transcriber.iter_streaming_segments(FakeModel(), "fake.wav", start_seconds=100.0,
+                                                        first_index=50))
+
+    words = " ".join(segment["text"] for segment in segments).split()
+    assert words == [f"w{number}" for number in range(201, 601)]
+    assert segments[0]["id"] == 50 and segments[0]["start"] == 100.0
+
+
+def test_stream_audio_windows_overlap(fake_audio):
+    windows = list(audio_io.stream_audio("fake.wav", window_seconds=30.0, overlap_seconds=2.0))
+
+    assert [offset for offset, _ in windows] == [28.0 * n for n in range(11)]
+    assert sum(len(samples) for _, samples in windows) - 10 * 2 * SAMPLE_RATE == 600 * WORD_SAMPLES
+    assert np.array_equal(np.concatenate([samples for _, samples in audio_io.stream_audio(
+        "fake.wav", overlap_seconds=0.0)]), np.frombuffer(fake_audio, np.int16) / 32768.0)
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import transcriber
+from backends import transcribe_with_checkpoints
+from job_control import JobControl, TranscriptionCancelled
+from result_cache import ResultCache
+
+torch = pytest.importorskip("torch")
+
+
+class FakeModel:
+    """Runs a (hookable) decoder module once per segment, like Whisper's decoding loop."""
+
+    def __init__(self, segments=4):
+        self.decoder = torch.nn.Identity()
+        self.segments = segments
+
+    def transcribe(self, audio, language=None, initial_prompt=None, **options):
+        segments = []
+        for i in range(self.segments):
+            self.decoder(torch.zeros(1))
+            segments.append({"start": 2.0 * i, "end": 2.0 * i + 2.0, "text": f" word{i}"})
+        return {"text": "".join(segment["text"] for segment in segments), "segments": segments}
+
+
+@pytest.fixture
+def recording(tmp_path, monkeypatch):
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"fake audio")
+    monkeypatch.setattr(transcriber, "probe_duration", lambda filepath: 8.0)
+    monkeypatch.setattr(transcriber, "load_audio", lambda filepath: np.zeros(8 * 16000, dtype=np.float32))
+    return str(path)
+
+
+def run(recording, output_dir, model, control=None, on_event=None, cache=None, monkeypatch=None):
+    monkeypatch.setattr(transcriber, "get_model", lambda *args, **kwargs: model)
+    output_dir.mkdir(exist_ok=True)
+    return transcriber.transcribe_audio_file(recording, str(output_dir), model_name="tiny", control=control,
+                                             on_event=on_event, cache=cache)
+
+
+def test_cancel_during_inference(recording, tmp_path, monkeypatch):
+    control = JobControl()
+
+    def on_event(event):
+        if event["event"] == "inference" and event["phase"] == "start":
+            control.cancel()
+
+    with pytest.raises(TranscriptionCancelled):
+        run(recording, tmp_path / "out", FakeModel(), control, on_event, monkeypatch=monkeypatch)
+    assert not (tmp_path / "out" / "a.txt").exists()
+
+
+def test_pause_during_inference(recording, tmp_path, monkeypatch):
+    control = JobControl()
+
+    def on_event(event):
+        if event["event"] == "inference" and event["phase"] == "start":
+            control.pause()
+            threading.Timer(0.2, control.resume).start()
+
+    start = time.perf_counter()
+    summary = run(recording, tmp_path / "out", FakeModel(), control, on_event, monkeypatch=monkeypatch)
+    assert time.perf_counter() - start >= 0.2
+    assert summary["segments"] == 4
+
+
+def test_complete_result_is_kept_when_cancelled_while_writing(recording, tmp_path, monkeypatch):
+    control = JobControl()
+    cache = ResultCache(str(tmp_path / "cache"))
+    events = []
+
+    def on_event(event):
+        events.append(event)
+        if event["event"] == "write" and event["phase"] == "start":
+            control.cancel()
+
+    summary = run(recording, tmp_path / "out", FakeModel(), control, on_event, cache, monkeypatch)
+    with open(summary["outputs"][0], encoding="utf-8") as f:
+        assert f.read().split() == ["word0", "word1", "word2", "word3"]
+    # Segments of a file transcribed in one piece are not reported as progress
+    assert not [event for event in events if event["event"] == "progress"]
+
+    events.clear()
+    run(recording, tmp_path / "out2", None, cache=cache, on_event=events.append, monkeypatch=monkeypatch)
+    assert "cache_hit" in [event["event"] for event in events]
+
+
+def test_whisper_decoder_steps_call_checkpoint():
+    pytest.importorskip("whisper")
+    from whisper.model import ModelDimensions, Whisper
+
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+                           n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1)
+    model = Whisper(dims)
+    calls = []
+
+    def checkpoint():
+        calls.append(None)
+        if len(calls) == 3:
+            raise TranscriptionCancelled()
+
+    with pytest.raises(TranscriptionCancelled):
+        transcribe_with_checkpoints(model, np.zeros(16000, dtype=np.float32), checkpoint, language="en", fp16=False)
+    assert len(calls) == 3
+    # Neither our hook nor whisper's kv-cache hooks are left behind
+    assert not any(module._forward_pre_hooks or module._forward_hooks for module in model.modules())
+
+
+def test_stale_partial_outputs_are_discarded_unless_resuming(recording, tmp_path, monkeypatch):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    stale = output_dir / "a.srt.part"
+    stale.write_text("1\n00:00:00,000 --> 00:00:05,000\nstale\n\n", encoding="utf-8")
+    (output_dir / "a.json.part").write_text("{", encoding="utf-8")
+
+    summary = run(recording, output_dir, FakeModel(), monkeypatch=monkeypatch)
+    assert summary["segments"] == 4
+    assert not stale.exists() and not (output_dir / "a.json.part").exists()
@@ -1,28 +1,298 @@
 # transcriber.py
-import whisper
+import logging
 import os
-from punctuation_replacer import transform_text_content
-from generate_srt import generate_srt
+import time
+from backends import DEFAULT_BACKEND, transcribe_with_checkpoints
+from model_cache import default_cache, get_model
+from audio_io import SAMPLE_RATE, load_audio, open_audio_stream, probe_duration
+from punctuation_replacer import punctuation_stream
+from output_writers import SrtWriter, TxtWriter, open_subtitle_writers, partial_path, prepare_resume
+from vad import SpeechTimeline, detect_speech
+from instrumentation import FileProgress
+from job_control import TranscriptionCancelled
+from language_id import AUTO, detect_language, language_info, load_head, log_detection
+
+# Recordings longer than this are decoded and transcribed window by window
+STREAMING_THRESHOLD_SECONDS = 600
+
+
+def transcribe_samples(model, samples, language="de", initial_prompt=None, vad_stats=None, word_timestamps=False,
+                       checkpoint=None):
+    """Transcribe an in-memory audio array and return its segments.
+
+    With ``vad_stats`` (a dict) only detected speech is passed to Whisper and
+    the segment timestamps are mapped back onto ``samples``; the dict collects
+    the total and speech durations. With ``word_timestamps`` every segment
+    also has Whisper's ``words``. ``checkpoint`` is called while decoding, see
+    ``backends.transcribe_with_checkpoints``.
+    """
+    options = {"word_timestamps": True} if word_timestamps else {}
+    if vad_stats is None:
+        return transcribe_with_checkpoints(model, samples, checkpoint, language=language,
+                                           initial_prompt=initial_prompt, **options)["segments"]
+
+    timeline = SpeechTimeline(samples, detect_speech(samples))
+    vad_stats["audio_seconds"] = vad_stats.get("audio_seconds", 0.0) + timeline.total_seconds
+    vad_stats["speech_seconds"] = vad_stats.get("speech_seconds", 0.0) + timeline.speech_seconds
+    if not timeline.speech_seconds:
+        return []
+    result = transcribe_with_checkpoints(model, timeline.audio, checkpoint, language=language,
+                                         initial_prompt=initial_prompt, **options)
+    return [timeline.map_segment(segment) for segment in result["segments"]]
+
+
+def iter_streaming_segments(model, filepath, language="de", window_seconds=30.0, start_seconds=0.0,
+                            first_index=0, vad_stats=None, progress=None, word_timestamps=False, checkpoint=None):
+    """Transcribe ``filepath`` window by window, yielding segments as they are produced.
+
+    Like Whisper's own seek loop, the last segment of a window may be cut off
+    at its end, so unless the window reaches the end of the file that segment
+    is dropped and the next window starts where it began. Timestamps are
+    shifted to the original timeline. Decode and inference time is added to
+    ``progress`` (a ``FileProgress``) if given; ``checkpoint`` is called
+    while a window is decoded.
+    """
+    last_end = start_seconds
+    prompt = None
+    index = first_index
+    with open_audio_stream(filepath, start_seconds) as audio:
+        while True:
+            clock = time.perf_counter()
+            offset = audio.offset_seconds
+            samples, is_last = audio.read(window_seconds)
+            if not len(samples):
+                break
+            now = time.perf_counter()
+            if progress is not None:
+                progress.add_time("decode", now - clock)
+
+            window_segments = transcribe_samples(model, samples, language, prompt, vad_stats, word_timestamps,
+                                                 checkpoint)
+            if progress is not None:
+                progress.add_time("inference", time.perf_counter() - now)
+
+            consumed = len(samples) / SAMPLE_RATE
+            if not is_last and len(window_segments) > 1 and window_segments[-1]["start"] > 0:
+                consumed = window_segments[-1]["start"]
+                window_segments = window_segments[:-1]
+            for segment in window_segments:
+                start = max(offset + segment["start"], last_end)
+                last_end = max(min(offset + segment["end"], offset + consumed), start)
+                text = segment["text"]
+                shifted = {"id": index, "start": start, "end": last_end, "text": text}
+                if segment.get("words"):
+                    shifted["words"] = [
+                        dict(word, start=min(max(offset + word["start"], start), last_end),
+                             end=min(max(offset + word["end"], start), last_end))
+                        for word in segment["words"]
+                    ]
+                yield shifted
+                index += 1
+                prompt = text
+            if is_last:
+                break
+            audio.advance(consumed)
+
 
 def transcribe_audio_file(filepath, output_dir, model_name="base", language="de", 
-                          diarize=False, apply_punctuation=False, generate_srt_file=False):
-    model = whisper.load_model(model_name)
-    result = model.transcribe(filepath, language=language)
+                          diarize=False, apply_punctuation=False, generate_srt_file=False,
+                          streaming=None, resume=False, vad=False, cache=None, on_event=None, control=None,
+                          backend=None, generate_vtt_file=False, generate_json_file=False, word_timestamps=False,
+                          cue_options=None):
+    """Transcribe ``filepath`` into TXT (and optionally SRT, WebVTT and JSON) files in ``output_dir``.
+
+    ``on_event`` receives the progress events described in ``FileProgress``:
+    ``model_load``, ``decode``, ``inference``, ``progress`` (per segment of a
+    recording transcribed window by window), ``postprocess``, ``write`` and
+    finally ``done``, ``cancelled`` or ``failed``. ``control`` is an optional
+    ``JobControl`` checked while decoding and between streamed segments; a
+    cancelled job raises ``TranscriptionCancelled`` and leaves the segments
+    written so far in the ``.part`` output files. ``backend`` names the inference
+    engine (see ``backends.BACKENDS``). With ``language="auto"`` the language
+    is detected from the first 30 s and reported in the summary's
+    ``language_detection``, flagged ``low_confidence`` if uncertain. Subtitle cues are split as described
+    in ``generate_srt.CueBuilder``, which takes ``cue_options``; with
+    ``word_timestamps`` they are cut at Whisper's word timings.
+    """
+    progress = FileProgress(filepath, on_event, probe_duration(filepath))
+    backend = backend or DEFAULT_BACKEND
+    progress.emit("start", audio_seconds=round(progress.audio_seconds, 2), model=model_name, language=language,
+                  backend=backend)
+    try:
+        summary = _transcribe(progress, filepath, output_dir, model_name, language, apply_punctuation,
+                              generate_srt_file, streaming, resume, vad, cache, control, backend,
+                              generate_vtt_file, generate_json_file, word_timestamps, cue_options)
+    except TranscriptionCancelled:
+        progress.emit("cancelled")
+        raise
+    except Exception as e:
+        progress.emit("failed", error=str(e))
+        raise
+    summary.update(progress.summary())
+    progress.emit("done", **progress.summary())
+    return summary
 
-    if not isinstance(result, dict) or "text" not in result:
-        raise ValueError("Invalid Whisper transcription output")
 
-    text = result["text"]
-    if apply_punctuation:
-        text = transform_text_content(text)
+def _transcribe(progress, filepath, output_dir, model_name, language, apply_punctuation,
+                generate_srt_file, streaming, resume, vad, cache, control, backend,
+                generate_vtt_file, generate_json_file, word_timestamps, cue_options):
+
+    def checkpoint():
+        if control is not None:
+            start = time.perf_counter()
+            control.checkpoint()
+            progress.exclude_time(time.perf_counter() - start)
+
+    if streaming is None:
+        streaming = progress.audio_seconds > STREAMING_THRESHOLD_SECONDS
+
+    cache_key = cached = None
+    if cache is not None:
+        cache_key = cache.key(filepath, model=model_name, language=language, vad=vad, streaming=streaming,
+                              backend=backend, word_timestamps=word_timestamps)
+        cached = cache.get(cache_key)
+        if language == AUTO and cached is not None and "language" not in cached:
+            cached = None
+        if cached is not None:
+            logging.info("Using cached transcription for %s", filepath)
+            progress.emit("cache_hit")
+            streaming = vad = False
 
     base = os.path.splitext(os.path.basename(filepath))[0]
     txt_path = os.path.join(output_dir, f"{base}.txt")
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(text)
-
-    if generate_srt_file and "segments" in result:
-        srt_text = generate_srt(result["segments"])
-        srt_path = os.path.join(output_dir, f"{base}.srt")
-        with open(srt_path, "w", encoding="utf-8") as f:
-            f.write(srt_text)
\ No newline at end of file
+    srt_path = os.path.join(output_dir, f"{base}.srt")
+    vtt_path = os.path.join(output_dir, f"{base}.vtt")
+    json_path = os.path.join(output_dir, f"{base}.json")
+
+    # Outputs are written to .part files and renamed once complete. Resuming
+    # needs the SRT timings of the segments completed in the partial file and
+    # the streaming decoder to seek past them.
+    done = []
+    if resume and streaming and generate_srt_file:
+        done = prepare_resume(partial_path(srt_path))
+    elif not resume:
+        # Left by an unrelated earlier run, e.g. with other options
+        for path in (txt_path, srt_path, vtt_path, json_path):
+            if os.path.exists(partial_path(path)):
+                os.remove(partial_path(path))
+
+    vad_stats = {"audio_seconds": 0.0, "speech_seconds": 0.0} if vad else None
+    model = None
+    if cached is None:
+        is_loaded = default_cache().contains(model_name, backend=backend)
+        with progress.stage("model_load", model=model_name, backend=backend, cached=is_loaded):
+            model = get_model(model_name, backend=backend)
+        checkpoint()
+
+    detection = None
+    if language == AUTO:
+        if cached is not None:
+            detection = cached["language"]
+        else:
+            with progress.stage("language_detection"):
+                head = load_head(filepath)
+                if vad:
+                    # Decide on speech, not on leading silence or music
+                    speech = SpeechTimeline(head, detect_speech(head)).audio
+                    head = speech if len(speech) else head
+                detection = language_info(*detect_language(model, head))
+        language = detection["language"]
+        log_detection(filepath, detection)
+        progress.emit("language", **detection)
+
+    if cached is not None:
+        result = cached
+        segments = cached["segments"]
+    elif streaming:
+        start = done[-1]["end"] if done else 0.0
+        progress.begin_inference(start)
+        segments = iter_streaming_segments(
+            model, filepath, language=language, start_seconds=start, first_index=len(done),
+            vad_stats=vad_stats, progress=progress, word_timestamps=word_timestamps, checkpoint=checkpoint,
+        )
+    else:
+        with progress.stage("decode"):
+            samples = load_audio(filepath)
+        progress.begin_inference()
+        with progress.stage("inference"):
+            if vad:
+                segments = transcribe_samples(model, samples, language, vad_stats=vad_stats,
+                                              word_timestamps=word_timestamps, checkpoint=checkpoint)
+                result = {"text": "".join(segment["text"] for segment in segments), "segments": segments}
+            else:
+                options = {"word_timestamps": True} if word_timestamps else {}
+                result = transcribe_with_checkpoints(model, samples, checkpoint, language=language, **options)
+                if not isinstance(result, dict) or "text" not in result:
+                    raise ValueError("Invalid Whisper transcription output")
+                segments = result.get("segments", [])
+
+    collected = []
+    write_seconds = 0.0
+    completed = False
+    txt_writer = TxtWriter(
+        txt_path, punctuation=punctuation_stream(language) if apply_punctuation else None, atomic=True
+    )
+    srt_writer = SrtWriter(
+        srt_path, append=bool(done), start_index=len(done) + 1, atomic=True, cue_options=cue_options
+    ) if generate_srt_file else None
+    # The SRT file continues after the resumed cues; the other outputs are rewritten
+    other_writers = open_subtitle_writers(
+        vtt_path=vtt_path if generate_vtt_file else None,
+        json_path=json_path if generate_json_file else None,
+        cue_options=cue_options,
+        metadata={"language": language, "language_detection": detection},
+    )
+    writers = [writer for writer in [srt_writer] + other_writers if writer]
+    if not streaming:
+        progress.emit("write", phase="start")
+    try:
+        for segment in done:
+            collected.append(segment)
+            txt_writer.write_segment(segment)
+            for writer in other_writers:
+                writer.write_segment(segment)
+        for segment in segments:
+            start = time.perf_counter()
+            collected.append(segment)
+            txt_writer.write_segment(segment)
+            for writer in writers:
+                writer.write_segment(segment)
+            write_seconds += time.perf_counter() - start
+            progress.segment(segment["end"], incremental=streaming)
+            # A complete result is written out even if the job was cancelled
+            # meanwhile; the cancellation then takes effect before the next file
+            if streaming:
+                checkpoint()
+        completed = True
+    finally:
+        start = time.perf_counter()
+        txt_writer.close(commit=completed)
+        for writer in writers:
+            writer.close(commit=completed)
+        write_seconds += time.perf_counter() - start
+
+    if streaming:
+        for stage in ("decode", "inference"):
+            progress.emit(stage, phase="end", seconds=round(progress.timings.get(stage, 0.0), 4))
+    # Punctuation runs inside the TXT writer; report it separately
+    progress.add_time("postprocess", txt_writer.punctuation_seconds)
+    progress.add_time("write", write_seconds - txt_writer.punctuation_seconds)
+    progress.emit("postprocess", phase="end", seconds=round(txt_writer.punctuation_seconds, 4))
+    progress.emit("write", phase="end", seconds=round(write_seconds - txt_writer.punctuation_seconds, 4))
+
+    if cache is not None and cached is None:
+        text = result["text"] if not streaming else "".join(segment["text"] for segment in collected)
+        cache.put(cache_key, text, collected, language=detection)
+
+    if vad_stats:
+        total = vad_stats["audio_seconds"]
+        saved = 1 - vad_stats["speech_seconds"] / total if total else 0.0
+        vad_stats["saved_fraction"] = saved
+        logging.info("VAD for %s: %.1fs of %.1fs audio transcribed, %.0f%% compute saved",
+                     filepath, vad_stats["speech_seconds"], total, saved * 100)
+    outputs = [txt_path]
+    for path, enabled in ((srt_path, generate_srt_file), (vtt_path, generate_vtt_file),
+                          (json_path, generate_json_file)):
+        if enabled:
+            outputs.append(path)
+    return {"vad": vad_stats, "outputs": outputs, "language": language, "language_detection": detection}
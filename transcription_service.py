@@ -0,0 +1,627 @@
+# transcription_service.py
+import argparse
+import json
+import logging
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+from backends import BACKENDS, DEFAULT_BACKEND, get_backend
+from instrumentation import JsonlEventLog, fan_out
+from job_control import JobControl, TranscriptionCancelled
+from scheduler import InsufficientMemory, plan_resources
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUED = 32
+DEFAULT_MAX_MODELS = 2
+# Finished jobs kept for status/result requests, and completed jobs the
+# latency figures are computed over
+MAX_FINISHED_JOBS = 1000
+LATENCY_WINDOW = 200
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after, message="job queue is full"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+def latency_stats(values):
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class ServiceJob:
+    def __init__(self, path, output_dir, options):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.output_dir = output_dir
+        self.options = options
+        self.route = (options["model_name"], options["backend"])
+        self.state = QUEUED
+        self.control = JobControl()
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = None
+        self.summary = None
+        self.error = None
+
+    def on_event(self, event):
+        if event["event"] == "progress":
+            self.progress = {name: event[name] for name in ("fraction", "eta_seconds", "audio_processed")}
+
+    def status(self):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "path": self.path,
+            "output_dir": self.output_dir,
+            "model": self.options["model_name"],
+            "backend": self.options["backend"],
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": self.progress,
+            "error": self.error,
+        }
+
+
+class ModelRoute:
+    """Job queue and warm worker threads for one (model, backend) pair.
+
+    Every route has its own workers, so jobs for a small model never wait
+    behind a long queue for a large one. A route is ``ready`` once its model
+    has been loaded.
+    """
+
+    def __init__(self, service, model_name, backend, workers):
+        self.service = service
+        self.model_name = model_name
+        self.backend = backend
+        self.jobs = queue.Queue()
+        self.queued = 0
+        self.running = 0
+        self.queue_wait = deque(maxlen=LATENCY_WINDOW)
+        self.run_seconds = deque(maxlen=LATENCY_WINDOW)
+        self.last_used = time.monotonic()
+        self.ready = False
+        self.threads = [
+            threading.Thread(target=self._work, name=f"worker-{model_name}-{backend}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _work(self):
+        from model_cache import get_model
+
+        try:
+            get_model(self.model_name, backend=self.backend)
+        except Exception as e:
+            # Every job of this route will fail with the same error
+            logging.error("Could not preload %s (%s): %s", self.model_name, self.backend, e)
+        self.ready = True
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            if self.service.start_job(self, job):
+                self.service.run_job(self, job)
+
+    @property
+    def idle(self):
+        return self.ready and not self.queued and not self.running
+
+    def stop(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+
+
+class TranscriptionService:
+    """Queue of transcription jobs for other tools on the same host.
+
+    At most ``max_queued`` jobs wait across all models; further submissions
+    are refused with ``QueueFull``. Each (model, backend) pair gets
+    ``workers_per_model`` worker threads that keep their model loaded in the
+    shared model cache; backends whose models cannot be shared between
+    threads get a single worker. At most ``max_models`` routes exist at a
+    time: a new model replaces the least recently used idle route, and is
+    refused with ``QueueFull`` while all routes are busy.
+    """
+
+    def __init__(self, output_dir, max_queued=DEFAULT_MAX_QUEUED, workers_per_model=1,
+                 max_models=DEFAULT_MAX_MODELS, use_cache=True, event_log=None):
+        from model_cache import default_cache
+
+        self.output_dir = output_dir
+        self.max_queued = max_queued
+        self.workers_per_model = workers_per_model
+        self.max_models = max_models
+        self.use_cache = use_cache
+        self.event_log = event_log
+        # One resident model per route keeps the workers warm
+        default_cache().max_models = max_models
+        self._routes = {}
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self.counts = {"submitted": 0, "rejected": 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+
+    def _route(self, model_name, backend):
+        key = (model_name, backend)
+        if key not in self._routes:
+            workers = self.workers_per_model
+            if workers > 1 and not get_backend(backend)["concurrent"]:
+                logging.warning("The %s backend cannot share a model between threads; "
+                                "using 1 worker for %s instead of %d", backend, model_name, workers)
+                workers = 1
+            logging.info("Starting %d worker(s) for %s (%s)", workers, model_name, backend)
+            self._routes[key] = ModelRoute(self, model_name, backend, workers)
+        return self._routes[key]
+
+    def _add_route(self, model_name, backend):
+        """Make room for and check the memory of a route that does not exist yet."""
+        from model_cache import default_cache
+
+        if len(self._routes) >= self.max_models:
+            idle = [route for route in self._routes.values() if route.idle]
+            if not idle:
+                raise QueueFull(self.retry_after(), f"all {self.max_models} model slots are busy")
+            route = min(idle, key=lambda route: route.last_used)
+            logging.info("Unloading %s (%s) to make room for %s (%s)", route.model_name, route.backend,
+                         model_name, backend)
+            del self._routes[(route.model_name, route.backend)]
+            route.stop()
+            default_cache().discard(route.model_name, backend=route.backend)
+        self._check_memory(model_name, backend)
+
+    def warm(self, model_name, backend=DEFAULT_BACKEND):
+        """Start the workers for a model ahead of its first job."""
+        with self._lock:
+            if (model_name, backend) not in self._routes:
+                self._add_route(model_name, backend)
+            self._route(model_name, backend)
+
+    def _check_memory(self, model_name, backend):
+        """Raise ``InsufficientMemory`` for a model that does not fit into free memory.
+
+        The workers of a route are threads sharing one loaded model.
+        """
+        from model_cache import default_cache
+
+        plan_resources(model_name, backend, resident=default_cache().contains(model_name, backend=backend),
+                       allow_downgrade=False)
+
+    def queued(self):
+        return sum(route.queued for route in self._routes.values())
+
+    def retry_after(self):
+        """Rough seconds until a queue slot frees up, for the 429 response."""
+        runs = [seconds for route in self._routes.values() for seconds in route.run_seconds]
+        return max(1, math.ceil(sum(runs) / len(runs))) if runs else 5
+
+    def submit(self, path, output_dir=None, model_name="tiny", language="de", backend=None,
+               apply_punctuation=False, generate_srt_file=False, vad=False, streaming=None,
+               generate_vtt_file=False, generate_json_file=False, word_timestamps=False, cue_options=None):
+        backend = backend or DEFAULT_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend {backend!r}")
+        if not os.path.isfile(path):
+            raise ValueError(f"no such file: {path}")
+        output_dir = output_dir or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        job = ServiceJob(os.path.abspath(path), output_dir, {
+            "model_name": model_name,
+            "language": language,
+            "backend": backend,
+            "apply_punctuation": apply_punctuation,
+            "generate_srt_file": generate_srt_file,
+            "vad": vad,
+            "streaming": streaming,
+            "generate_vtt_file": generate_vtt_file,
+            "generate_json_file": generate_json_file,
+            "word_timestamps": word_timestamps,
+            "cue_options": cue_options,
+        })
+        with self._lock:
+            if self.queued() >= self.max_queued:
+                self.counts["rejected"] += 1
+                raise QueueFull(self.retry_after())
+            if (model_name, backend) not in self._routes:
+                try:
+                    self._add_route(model_name, backend)
+                except QueueFull:
+                    self.counts["rejected"] += 1
+                    raise
+            route = self._route(model_name, backend)
+            route.queued += 1
+            route.last_used = time.monotonic()
+            self._jobs[job.id] = job
+            self.counts["submitted"] += 1
+            self._forget_finished()
+        route.jobs.put(job)
+        logging.info("Queued job %s for %s (%s, %s)", job.id, job.path, model_name, backend)
+        return job
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in (DONE, FAILED, CANCELLED)]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Cancel a job; a queued one is dropped, a running one stops at its next segment."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state == QUEUED:
+                self._routes[job.route].queued -= 1
+                self._finish(job, CANCELLED)
+            elif job.state == RUNNING:
+                job.control.cancel()
+            return job
+
+    def start_job(self, route, job):
+        """Move a dequeued job to running; False if it was cancelled while queued."""
+        with self._lock:
+            if job.state != QUEUED:
+                return False
+            route.queued -= 1
+            route.running += 1
+            job.state = RUNNING
+            job.started = time.time()
+            route.queue_wait.append(job.started - job.submitted)
+            return True
+
+    def _finish(self, job, state):
+        job.state = state
+        job.finished = time.time()
+        self.counts[state] += 1
+
+    def run_job(self, route, job):
+        from audio_io import prepared_input
+        from result_cache import default_result_cache
+        from transcriber import transcribe_audio_file
+
+        state = FAILED
+        try:
+            with prepared_input(job.path) as local_path:
+                job.summary = transcribe_audio_file(
+                    local_path,
+                    job.output_dir,
+                    cache=default_result_cache() if self.use_cache else None,
+                    on_event=fan_out(self.event_log, job.on_event),
+                    control=job.control,
+                    **job.options
+                )
+            state = DONE
+        except TranscriptionCancelled:
+            state = CANCELLED
+        except Exception as e:
+            logging.error("Job %s failed for %s: %s", job.id, job.path, e)
+            job.error = str(e)
+        with self._lock:
+            route.running -= 1
+            self._finish(job, state)
+            if state == DONE:
+                route.run_seconds.append(job.finished - job.started)
+        logging.info("Job %s %s", job.id, state)
+
+    def result(self, job):
+        outputs = job.summary["outputs"]
+        texts = {}
+        for path in outputs:
+            with open(path, "r", encoding="utf-8") as f:
+                texts[os.path.splitext(path)[1].lstrip(".")] = f.read()
+        return {"id": job.id, "outputs": outputs, "summary": job.summary, **texts}
+
+    def metrics(self):
+        from model_cache import cache_stats
+
+        with self._lock:
+            routes = {
+                f"{model}/{backend}": {
+                    "workers": len(route.threads),
+                    "queued": route.queued,
+                    "running": route.running,
+                    "queue_wait_seconds": latency_stats(route.queue_wait),
+                    "run_seconds": latency_stats(route.run_seconds),
+                }
+                for (model, backend), route in self._routes.items()
+            }
+            return {
+                "uptime_seconds": round(time.time() - self._started, 1),
+                "queued": self.queued(),
+                "max_queued": self.max_queued,
+                "running": sum(route.running for route in self._routes.values()),
+                "jobs": dict(self.counts),
+                "queue_wait_seconds": latency_stats([s for r in self._routes.values() for s in r.queue_wait]),
+                "run_seconds": latency_stats([s for r in self._routes.values() for s in r.run_seconds]),
+                "routes": routes,
+                "models": cache_stats(),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._jobs.values():
+                job.control.cancel()
+            for route in self._routes.values():
+                for _ in route.threads:
+                    route.jobs.put(None)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON API: POST /jobs, GET /jobs[/<id>[/result]], POST /jobs/<id>/cancel, GET /metrics, GET /health."""
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _parts(self):
+        return [part for part in self.path.split("?")[0].split("/") if part]
+
+    def _job(self, job_id):
+        job = self.service.get(job_id)
+        if job is None:
+            self._send(404, {"error": f"unknown job {job_id}"})
+        return job
+
+    def do_GET(self):
+        parts = self._parts()
+        if parts == ["health"]:
+            self._send(200, {"status": "ok"})
+        elif parts == ["metrics"]:
+            self._send(200, self.service.metrics())
+        elif parts == ["jobs"]:
+            self._send(200, {"jobs": [job.status() for job in self.service.jobs()]})
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job:
+                self._send(200, job.status())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            job = self._job(parts[1])
+            if job and job.state != DONE:
+                self._send(409, {"error": f"job is {job.state}", "state": job.state})
+            elif job:
+                self._send(200, self.service.result(job))
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        parts = self._parts()
+        if parts == ["jobs"]:
+            self._submit()
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            job = self.service.cancel(parts[1])
+            if job is None:
+                self._send(404, {"error": f"unknown job {parts[1]}"})
+            else:
+                self._send(200, job.status())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _submit(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            path = body.pop("path")
+            job = self.service.submit(path, **body)
+        except QueueFull as e:
+            self._send(429, {"error": str(e), "retry_after": e.retry_after}, {"Retry-After": str(e.retry_after)})
+        except InsufficientMemory as e:
+            self._send(503, {"error": str(e)})
+        except (KeyError, TypeError, ValueError) as e:
+            self._send(400, {"error": f"invalid job: {e}"})
+        else:
+            self._send(202, job.status(), {"Location": f"/jobs/{job.id}"})
+
+    def log_message(self, format, *args):
+        logging.info("%s %s", self.address_string(), format % args)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+class ServiceClient:
+    """Minimal client for the service's JSON API."""
+
+    def __init__(self, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urlrequest.Request(self.url + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as response:
+                return json.load(response)
+        except urlerror.HTTPError as e:
+            message = json.load(e).get("error", e.reason)
+            raise ServiceError(e.code, message) from None
+
+    def submit(self, path, **options):
+        return self._request("POST", "/jobs", dict(options, path=os.path.abspath(path)))
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def result(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}/result")
+
+    def cancel(self, job_id):
+        return self._request("POST", f"/jobs/{job_id}/cancel")
+
+    def metrics(self):
+        return self._request("GET", "/metrics")
+
+    def wait(self, job_id, poll_seconds=0.5, timeout=None):
+        """Poll until the job has finished; returns its final status."""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            status = self.status(job_id)
+            if status["state"] in (DONE, FAILED, CANCELLED):
+                return status
+            if deadline and time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} still {status['state']}")
+            time.sleep(poll_seconds)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Local transcription service and client.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the service")
+    serve.add_argument("-o", "--output-dir", required=True, help="Default directory for the transcripts")
+    serve.add_argument("--host", default=DEFAULT_HOST, help=f"Address to bind (default: {DEFAULT_HOST})")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    serve.add_argument("--max-queued", type=int, default=DEFAULT_MAX_QUEUED,
+                       help=f"Jobs that may wait before submissions get HTTP 429 (default: {DEFAULT_MAX_QUEUED})")
+    serve.add_argument("--workers-per-model", type=int, default=1,
+                       help="Worker threads per model; the whisper backends always use 1 (default: 1)")
+    serve.add_argument("--max-models", type=int, default=DEFAULT_MAX_MODELS,
+                       help=f"Models kept loaded at the same time (default: {DEFAULT_MAX_MODELS})")
+    serve.add_argument("--preload", nargs="*", default=[], metavar="MODEL",
+                       help="Models to load at startup with the default backend")
+    serve.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    serve.add_argument("--events", metavar="FILE", help="Append per-stage timing and progress events to a JSONL file")
+
+    submit = commands.add_parser("submit", help="Submit a recording")
+    submit.add_argument("audio", help="Recording to transcribe")
+    submit.add_argument("-o", "--output-dir", help="Directory for the transcripts (default: the service's)")
+    submit.add_argument("-m", "--model", default="tiny", help="Whisper model name (default: tiny)")
+    submit.add_argument("-l", "--language", default="de", help="Language code (default: de)")
+    submit.add_argument("-b", "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    submit.add_argument("--punctuate", action="store_true", help="Convert spoken punctuation commands")
+    submit.add_argument("--srt", action="store_true", help="Also write an SRT file")
+    submit.add_argument("--vtt", action="store_true", help="Also write a WebVTT file")
+    submit.add_argument("--json", action="store_true", help="Also write the segments (and word timings) as JSON")
+    submit.add_argument("--word-timestamps", action="store_true", help="Cut subtitle cues at word boundaries")
+    submit.add_argument("--vad", action="store_true", help="Only transcribe detected speech regions")
+    submit.add_argument("--wait", action="store_true", help="Wait for the job and print its transcript")
+
+    for name in ("status", "result", "cancel"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} of a job")
+        command.add_argument("job_id")
+    commands.add_parser("metrics", help="Queue depth, latency and model cache figures")
+
+    for command in commands.choices.values():
+        if command is not serve:
+            command.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", help="Service URL")
+    return parser
+
+
+def serve(args):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.host not in ("127.0.0.1", "localhost", "::1"):
+        logging.warning("The service has no authentication; binding to %s exposes it to the network", args.host)
+    event_log = JsonlEventLog(args.events) if args.events else None
+    service = TranscriptionService(args.output_dir, args.max_queued, args.workers_per_model, args.max_models,
+                                   use_cache=not args.no_cache, event_log=event_log)
+    for model_name in args.preload:
+        try:
+            service.warm(model_name)
+        except (InsufficientMemory, QueueFull) as e:
+            logging.error("Not preloading %s: %s", model_name, e)
+    server = make_server(service, args.host, args.port)
+    logging.info("Listening on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if event_log:
+            event_log.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "serve":
+        serve(args)
+        return 0
+
+    client = ServiceClient(args.url)
+    try:
+        if args.command == "submit":
+            job = client.submit(args.audio, output_dir=args.output_dir, model_name=args.model,
+                                language=args.language, backend=args.backend, apply_punctuation=args.punctuate,
+                                generate_srt_file=args.srt, vad=args.vad, generate_vtt_file=args.vtt,
+                                generate_json_file=args.json, word_timestamps=args.word_timestamps)
+            if not args.wait:
+                print(json.dumps(job, indent=2))
+                return 0
+            status = client.wait(job["id"])
+            if status["state"] != DONE:
+                print(json.dumps(status, indent=2))
+                return 1
+            print(client.result(job["id"])["txt"])
+        elif args.command == "metrics":
+            print(json.dumps(client.metrics(), indent=2))
+        else:
+            print(json.dumps(getattr(client, args.command)(args.job_id), indent=2))
+    except ServiceError as e:
+        print(f"Error {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,16 +17,47 @@ Die Dauer der Verarbeitung hängt von der Länge der Datei, der Größe des gew
         "browse": "Durchsuchen",
         "model": "Modell wählen:",
         "model_options": ["winzig", "mittel", "mittelgroß (effizienter)", "groß", "groß (neuere Version)"],
+        "backend": "Rechen-Engine wählen:",
+        "backend_names": {
+            "whisper": "Standard (PyTorch)",
+            "whisper-int8": "Kompakt (PyTorch int8, nur CPU)",
+            "faster-whisper": "Schnell auf CPU (faster-whisper int8)",
+        },
         "language": "Sprache wählen:",
-        "language_note": "Die Defaultsprache ist Deutsch (de), aber das Modell kann auch mit weiteren Sprachen arbeiten. Wenn die Datei nicht deutsch ist, tippen Sie hier einfach manuell den Namen oder Code für die jeweilige Sprache ein. Die vollständige Sprachliste entnehmen Sie bitte dem Handbuch.",
+        "language_note": "Die Defaultsprache ist Deutsch (de), aber das Modell kann auch mit weiteren Sprachen arbeiten. Mit 'auto' erkennt das Modell die Sprache jeder Datei anhand der ersten 30 Sekunden; unsichere Erkennungen werden am Ende aufgelistet. Sie können auch manuell den Namen oder Code für die jeweilige Sprache eintippen. Die vollständige Sprachliste entnehmen Sie bitte dem Handbuch.",
         "punctuate": "Zeichensetzung bei Diktataufnahmen",
-        "punctuate_info": "Wenn Ihre Audiodatei Begriffe wie 'PUNKT' zur Kennzeichnung von Satzzeichen enthält, können diese durch Aktivieren dieser Checkbox automatisch in die entsprechenden Satzzeichen umgewandelt werden.",
+        "punctuate_info": "Wenn Ihre Audiodatei Begriffe wie 'PUNKT' zur Kennzeichnung von Satzzeichen enthält, können diese durch Aktivieren dieser Checkbox automatisch in die entsprechenden Satzzeichen umgewandelt werden. Die Befehle richten sich nach der gewählten Sprache (z. B. 'period' für Englisch, 'virgule' für Französisch).",
         "srt": "SRT-Datei erzeugen",
         "srt_info": "Eine SRT-Datei ist eine zeitgestempelte Textdatei. Bei Aktivierung dieser Checkbox wird automatisch neben dem normalen Text-Output (TXT-Datei) auch eine SRT-Datei erstellt.",
+        "vad": "Stille überspringen",
+        "vad_info": "Erkennt Sprachabschnitte vor der Transkription und überspringt Stille und Raumgeräusche. Das beschleunigt Aufnahmen mit vielen Pausen (z. B. Diktate) und vermeidet erfundenen Text in stillen Passagen. Die Zeitstempel in der SRT-Datei bleiben korrekt.",
         "start": "Transkribieren starten",
         "ready": "Bereit.",
         "processing": "Verarbeite: {}",
         "finished": "Fertig!",
+        "progress_model_load": "Lade KI-Modell...",
+        "progress_decode": "Lese Audiodatei...",
+        "progress_inference": "Transkribiere...",
+        "progress_cached": "Verwende gespeicherte Transkription...",
+        "progress_language_detection": "Erkenne Sprache...",
+        "progress_write": "Speichere Transkription...",
+        "progress_language": "Erkannte Sprache: {language} ({percent}%)",
+        "progress_segment": "{percent}% transkribiert, noch ca. {eta}",
+        "pause": "Pause",
+        "resume": "Fortsetzen",
+        "cancel": "Abbrechen",
+        "paused": "Pausiert.",
+        "cancelling": "Wird abgebrochen...",
+        "cancelled": "Abgebrochen.",
+        "finished_with_errors": "Fertig, mit Fehlern.",
+        "summary": "{finished} Datei(en) transkribiert, {failed} fehlgeschlagen.",
+        "batch_errors": "Fehlgeschlagene Dateien:",
+        "uncertain_language": "Sprache unsicher erkannt, bitte prüfen:",
+        "memory_title": "Zu wenig Arbeitsspeicher",
+        "memory_refused": "Das Modell {model} braucht etwa {need:.1f} GB Arbeitsspeicher, frei sind nur {available:.1f} GB. Bitte schließen Sie andere Programme oder wählen Sie ein kleineres Modell bzw. die Engine faster-whisper.",
+        "memory_downgrade": "Das Modell {model} braucht etwa {need:.1f} GB Arbeitsspeicher, frei sind nur {available:.1f} GB. Der Rechner würde stark ausgelagert werden oder die Transkription abbrechen.\n\nStattdessen das kleinere Modell {smaller} verwenden?",
+        "resume_batch": "Unterbrochene Transkription fortsetzen ({} Dateien)",
+        "retry_wait": "Neuer Versuch für fehlgeschlagene Dateien in {} s...",
         "copyright": "(C) 2025 | Saran Nair & Andreas Weilinghoff | University of Koblenz",
         "error_file": "Bitte wählen Sie mindestens eine Audiodatei.",
         "error_dir": "Bitte wählen Sie einen Speicherort.",
@@ -52,16 +83,47 @@ Processing time depends on file length, model size, and your device's processing
         "browse": "Browse",
         "model": "Choose model:",
         "model_options": ["tiny", "medium", "medium (efficient)", "large", "large (newer version)"],
+        "backend": "Choose engine:",
+        "backend_names": {
+            "whisper": "Standard (PyTorch)",
+            "whisper-int8": "Compact (PyTorch int8, CPU only)",
+            "faster-whisper": "Fast on CPU (faster-whisper int8)",
+        },
         "language": "Choose language:",
-        "language_note": "The default language is German (de), but the model can work with other languages. If your file is not in German, manually enter the language name or code here. Please refer to the manual for the full language list.",
+        "language_note": "The default language is German (de), but the model can work with other languages. With 'auto' the model detects the language of each file from its first 30 seconds; uncertain detections are listed at the end. You can also manually enter the language name or code here. Please refer to the manual for the full language list.",
         "punctuate": "Punctuation for dictation recordings",
-        "punctuate_info": "If your audio file contains terms like 'PUNKT' to indicate punctuation, enabling this checkbox will automatically convert them to the appropriate punctuation marks.",
+        "punctuate_info": "If your audio file contains terms like 'PUNKT' to indicate punctuation, enabling this checkbox will automatically convert them to the appropriate punctuation marks. The commands follow the selected language (e.g. 'period' for English, 'virgule' for French).",
         "srt": "Generate SRT file",
         "srt_info": "An SRT file is a timestamped text file. Enabling this checkbox will create both a normal text output (TXT file) and an SRT file.",
+        "vad": "Skip silence",
+        "vad_info": "Detects speech before transcription and skips silence and room noise. This speeds up recordings with many pauses (e.g. dictations) and avoids invented text in silent passages. Timestamps in the SRT file stay correct.",
         "start": "Start Transcription",
         "ready": "Ready.",
         "processing": "Processing: {}",
         "finished": "Finished!",
+        "progress_model_load": "Loading AI model...",
+        "progress_decode": "Reading audio file...",
+        "progress_inference": "Transcribing...",
+        "progress_cached": "Using saved transcription...",
+        "progress_language_detection": "Detecting language...",
+        "progress_write": "Saving transcript...",
+        "progress_language": "Detected language: {language} ({percent}%)",
+        "progress_segment": "{percent}% transcribed, about {eta} left",
+        "pause": "Pause",
+        "resume": "Resume",
+        "cancel": "Cancel",
+        "paused": "Paused.",
+        "cancelling": "Cancelling...",
+        "cancelled": "Cancelled.",
+        "finished_with_errors": "Finished with errors.",
+        "summary": "{finished} file(s) transcribed, {failed} failed.",
+        "batch_errors": "Failed files:",
+        "uncertain_language": "Language detection uncertain, please check:",
+        "memory_title": "Not enough memory",
+        "memory_refused": "The model {model} needs about {need:.1f} GB of memory, but only {available:.1f} GB are free. Please close other programs or choose a smaller model or the faster-whisper engine.",
+        "memory_downgrade": "The model {model} needs about {need:.1f} GB of memory, but only {available:.1f} GB are free. The computer would swap heavily or the transcription could be killed.\n\nUse the smaller model {smaller} instead?",
+        "resume_batch": "Resume interrupted transcription ({} files)",
+        "retry_wait": "Retrying failed files in {} s...",
         "copyright": "(C) 2025 | Saran Nair & Andreas Weilinghoff | University of Koblenz",
         "error_file": "Please select at least one audio file.",
         "error_dir": "Please select an output directory.",
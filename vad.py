@@ -0,0 +1,97 @@
+# vad.py
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE
+
+FRAME_SECONDS = 0.03
+
+
+def detect_speech(samples, sample_rate=SAMPLE_RATE, threshold_db=None, min_speech_seconds=0.25,
+                  min_silence_seconds=0.5, padding_seconds=0.2):
+    """Return ``(start, end)`` sample ranges that contain speech.
+
+    Energy based: a frame counts as speech when its RMS level is well above the
+    recording's noise floor. Short gaps are bridged, short bursts dropped and
+    every region is padded so word onsets are not clipped.
+    """
+    frame = int(FRAME_SECONDS * sample_rate)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return []
+
+    frames = samples[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    level = 20 * np.log10(np.maximum(rms, 1e-10))
+    if threshold_db is None:
+        noise_floor = np.percentile(level, 10)
+        threshold_db = min(max(noise_floor + 12.0, -55.0), np.percentile(level, 95) - 15.0)
+    active = level > threshold_db
+
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], active.astype(np.int8), [0]])))
+    regions = edges.reshape(-1, 2).tolist()
+
+    max_gap = int(min_silence_seconds / FRAME_SECONDS)
+    merged = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] <= max_gap:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+
+    min_frames = int(min_speech_seconds / FRAME_SECONDS)
+    pad = int(padding_seconds * sample_rate)
+    speech = []
+    for first, last in merged:
+        if last - first < min_frames:
+            continue
+        begin = max(0, first * frame - pad)
+        end = min(len(samples), last * frame + pad)
+        if speech and begin <= speech[-1][1]:
+            speech[-1] = (speech[-1][0], end)
+        else:
+            speech.append((begin, end))
+    return speech
+
+
+class SpeechTimeline:
+    """Concatenation of speech regions with a map back to the original timeline."""
+
+    def __init__(self, samples, regions, sample_rate=SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.total_seconds = len(samples) / sample_rate
+        self.audio = (
+            np.concatenate([samples[start:end] for start, end in regions])
+            if regions else np.zeros(0, dtype=np.float32)
+        )
+        self._concat_starts = []
+        self._original_starts = []
+        position = 0
+        for start, end in regions:
+            self._concat_starts.append(position / sample_rate)
+            self._original_starts.append(start / sample_rate)
+            position += end - start
+
+    @property
+    def speech_seconds(self):
+        return len(self.audio) / self.sample_rate
+
+    def to_original(self, seconds, is_end=False):
+        if not self._concat_starts:
+            return seconds
+        find = bisect_left if is_end else bisect_right
+        i = max(find(self._concat_starts, seconds) - 1, 0)
+        return self._original_starts[i] + seconds - self._concat_starts[i]
+
+    def map_segment(self, segment):
+        mapped = dict(segment)
+        mapped["start"] = self.to_original(segment["start"])
+        mapped["end"] = max(self.to_original(segment["end"], is_end=True), mapped["start"])
+        if segment.get("words"):
+            mapped["words"] = [
+                dict(word, start=self.to_original(word["start"]),
+                     end=max(self.to_original(word["end"], is_end=True), self.to_original(word["start"])))
+                for word in segment["words"]
+            ]
+        return mapped